@@ -0,0 +1,266 @@
+import argparse
+import colorsys
+import math
+import time
+from effects import Static
+from instrument import Histogram
+from packet.raw import ErrorResponse
+from packet.types import RGB
+from state import ZONE_ID_LOGO
+from zone import Zone, Ring, Logo
+
+
+VENDOR_ID = 0x2516
+PRODUCT_ID = 0x0051
+
+
+class Track:
+    """The animation of a single zone, see Engine.add().
+
+    Parameters
+    ----------
+    zone : Zone
+        The zone to animate, its effect must be Static.
+    render : callable
+        render(t) -> RGB, the colour at t seconds into the animation. None
+        keeps the previous colour.
+    fps : float
+        The target frame rate.
+
+    """
+
+    def __init__(self, zone: Zone, render, fps: float):
+        if type(zone.effect) != Static:
+            raise TypeError("Zone %s must show a Static effect to be animated, got %s." %
+                            (type(zone).__name__, type(zone.effect).__name__))
+        assert fps > 0, "Expected a positive frame rate, got %s" % fps
+
+        self.zone = zone
+        self.render = render
+        self.fps = fps
+        self.period = 1.0 / fps
+        self.frame = 0      # The index of the next frame, its deadline is start + frame * period
+        self.last = None    # The bytes of the colour last sent, None when unknown
+        self.value = None   # The bytes of the colour being sent
+
+        self.rendered = 0
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.lateness = Histogram()
+        self.squares = 0.0
+
+    def stats(self, elapsed: float) -> dict:
+        """The achieved frame rates, frame counts and jitter (in seconds) of the track.
+
+           'fps' counts the frames delivered to the device, 'render_fps' every
+           frame rendered, including the skipped and failed ones.
+        """
+        count = self.lateness.count
+        mean = self.lateness.total / count if count else 0.0
+        return {
+            'zone': type(self.zone).__name__,
+            'target_fps': self.fps,
+            'fps': self.sent / elapsed if elapsed > 0 else 0.0,
+            'render_fps': self.rendered / elapsed if elapsed > 0 else 0.0,
+            'frames': self.rendered,
+            'sent': self.sent,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'dropped': self.dropped,
+            'jitter': math.sqrt(max(0.0, self.squares / count - mean * mean)) if count else 0.0,
+            'lateness': self.lateness.stats(),
+        }
+
+
+class Engine:
+    """Streams host rendered colours to the zones at a fixed frame rate.
+
+       Each zone is given a render function and a target frame rate. Frames
+       are scheduled against absolute deadlines (start + n / fps) of a
+       monotonic clock, so timing errors never accumulate.
+
+       The colours due at the same time are committed in a single
+       transaction, see Transaction. When the USB falls behind, the frames
+       whose deadline has passed by more than a period are dropped, only the
+       latest one is rendered and sent. Frames identical to the last colour
+       sent to a zone are skipped, a frame the device rejected is sent
+       again even when identical.
+
+    Parameters
+    ----------
+    driver : Driver
+        The (attached) driver to stream to.
+    clock : callable
+        The monotonic clock, in seconds.
+    sleep : callable
+        Waits for the given number of seconds.
+
+    """
+
+    def __init__(self, driver, clock=time.monotonic, sleep=time.sleep):
+        self.driver = driver
+        self.clock = clock
+        self.sleep = sleep
+        self.tracks = []
+        self.running = False
+        self.start = None
+        self.elapsed = 0.0
+
+    def add(self, zone: Zone, render, fps: float = 30) -> Track:
+        """Animates a zone, see Track."""
+        track = Track(zone, render, fps)
+        self.tracks.append(track)
+        return track
+
+    def stop(self) -> None:
+        """Stops run() after the current frame, may be called from another thread."""
+        self.running = False
+
+    def run(self, duration: float = None) -> list:
+        """Runs the animations until stopped, or for the given number of seconds.
+
+        Returns
+        -------
+        list
+            The statistics of each track, in the order they were added, see
+            Track.stats().
+
+        """
+
+        assert self.tracks, "Nothing to animate"
+        clock = self.clock
+        start = self.start = clock()
+        end = start + duration if duration is not None else None
+
+        self.running = True
+        while self.running:
+            deadline = start + min(track.frame * track.period for track in self.tracks)
+            if end is not None and deadline >= end:
+                break
+
+            delay = deadline - clock()
+            if delay > 0:
+                self.sleep(delay)
+
+            due = self._render(start, clock())
+            if due:
+                self._send(due)
+
+        self.running = False
+        self.elapsed = clock() - start
+        return self.stats()
+
+    def _render(self, start: float, now: float) -> list:
+        due = []
+        for track in self.tracks:
+            scheduled = start + track.frame * track.period
+            if scheduled > now:
+                continue
+
+            # Frames overtaken by the following deadline are dropped rather than sent late
+            behind = int((now - scheduled) / track.period)
+            if behind:
+                track.dropped += behind
+                track.frame += behind
+                scheduled += behind * track.period
+            track.frame += 1
+
+            late = now - scheduled
+            track.lateness.add(late)
+            track.squares += late * late
+
+            color = track.render(scheduled - start)
+            track.rendered += 1
+            value = bytes(color) if color is not None else None
+            if value is None or value == track.last:
+                track.skipped += 1
+                continue
+
+            track.zone.effect.setColor(color)
+            track.value = value
+            due.append(track)
+
+        return due
+
+    def _send(self, due: list) -> None:
+        transaction = self.driver.transaction()
+        transaction.add(*(track.zone for track in due))
+        responses = transaction.commit()
+
+        # A rejected settings packet fails its track, any other rejected packet the whole frame
+        tracks = {id(track.zone.effect.getSettings()): track for track in due}
+        failed = set()
+        for (packet, response) in zip(transaction.sent, responses):
+            if isinstance(response, ErrorResponse):
+                track = tracks.get(id(packet))
+                failed.update((track,) if track is not None else due)
+
+        for track in due:
+            if track in failed:
+                track.last = None
+                track.failed += 1
+            else:
+                track.last = track.value
+                track.sent += 1
+
+    def stats(self) -> list:
+        return [track.stats(self.elapsed) for track in self.tracks]
+
+
+def hue(period: float, saturation: float = 1.0, value: float = 1.0):
+    """A render function cycling through the hues once per period."""
+    def render(t: float) -> RGB:
+        (r, g, b) = colorsys.hsv_to_rgb((t / period) % 1.0, saturation, value)
+        return RGB(int(r * 255), int(g * 255), int(b * 255))
+    return render
+
+
+def pulse(color: RGB, period: float):
+    """A render function fading a colour in and out once per period."""
+    (r, g, b) = bytes(color)
+
+    def render(t: float) -> RGB:
+        level = (1 - math.cos(2 * math.pi * t / period)) / 2
+        return RGB(int(r * level), int(g * level), int(b * level))
+    return render
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Streams a host rendered animation to the cooler.')
+    parser.add_argument('--fps', type=float, default=30)
+    parser.add_argument('--duration', type=float, default=5, help='In seconds.')
+    parser.add_argument('--emulate', action='store_true', help='Animate an emulated device.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Emulated per packet latency in ms.')
+    args = parser.parse_args()
+
+    if args.emulate:
+        from emulator import Emulator, EmulatedDriver
+        driver = EmulatedDriver(Emulator(args.latency / 1000))
+    else:
+        from driver import Driver
+        driver = Driver(VENDOR_ID, PRODUCT_ID)
+    driver.attach()
+
+    ring = Ring(Static(driver.state.getSettings(0x00)))
+    logo = Logo(Static(driver.state.getSettings(ZONE_ID_LOGO)))
+
+    engine = Engine(driver)
+    engine.add(ring, hue(3.0), args.fps)
+    engine.add(logo, pulse(RGB(0xFF, 0x40, 0x00), 2.0), args.fps / 2)
+    try:
+        stats = engine.run(args.duration)
+    finally:
+        driver.detach()
+
+    for track in stats:
+        print("%-6s %6.1f/%.1f fps  %6.1f rendered  %5d sent  %5d failed  %5d skipped  %5d dropped  "
+              "jitter %7.3f ms  p99 late %7.3f ms" % (track['zone'], track['fps'], track['target_fps'],
+                                                      track['render_fps'], track['sent'], track['failed'],
+                                                      track['skipped'], track['dropped'], track['jitter'] * 1000,
+                                                      track['lateness']['p99'] * 1000))
+
+
+if __name__ == '__main__':
+    main()
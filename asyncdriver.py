@@ -0,0 +1,61 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from driver import Driver
+
+
+class AsyncDriver:
+    """Exposes a Driver to asyncio code.
+
+       A single I/O thread owns the device. Every call is queued onto that
+       thread, so concurrent coroutines never contend for the interface and
+       the event loop is never blocked by a transfer.
+
+    Parameters
+    ----------
+    driver : Driver
+        The (possibly not yet attached) driver to wrap.
+
+    """
+
+    def __init__(self, driver: Driver):
+        self.driver = driver
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='plasma-io')
+
+    async def __aenter__(self) -> 'AsyncDriver':
+        await self.attach()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _submit(self, fn, *args) -> asyncio.Future:
+        return asyncio.wrap_future(self.executor.submit(fn, *args), loop=asyncio.get_running_loop())
+
+    def attach(self) -> asyncio.Future:
+        return self._submit(self.driver.attach)
+
+    def detach(self) -> asyncio.Future:
+        return self._submit(self.driver.detach)
+
+    def post(self, request, timeout=100) -> asyncio.Future:
+        """Queues a single packet, see Driver.post()."""
+        return self._submit(self.driver.post, request, timeout)
+
+    def post_many(self, requests, timeout=100) -> asyncio.Future:
+        """Queues a batch of packets, see Driver.post_many().
+
+           The batch is sent as a whole, packets from other callers are never
+           interleaved with it.
+        """
+        return self._submit(self.driver.post_many, list(requests), timeout)
+
+    async def close(self) -> None:
+        """Detaches the driver once the queued calls are done, and stops the I/O thread.
+
+           The detach runs after every call queued before it, so the thread
+           is idle once it is awaited and the shutdown does not wait.
+        """
+        try:
+            await self.detach()
+        finally:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,95 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from emulator import Emulator, EmulatedDriver
+from state import DeviceState
+from instrument import Instruments, STAGES
+
+
+def report(name: str, count: int, elapsed: float) -> None:
+    print("%-24s %8d packets %10.3f ms %10.1f us/packet" % (
+        name, count, elapsed * 1000, elapsed * 1000000 / count))
+
+
+def bench_transport(args) -> None:
+    driver = EmulatedDriver(Emulator(args.latency / 1000, args.jitter / 1000, seed=0),
+                            strict=not (args.fast or args.lazy), lazy=args.lazy)
+    driver.attach()
+    packets = DeviceState().packets()
+    if args.instrument:
+        driver.instrument(Instruments())
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for packet in packets:
+            driver.post(packet)
+    report('post', args.rounds * len(packets), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        driver.post_many(packets)
+    report('post_many', args.rounds * len(packets), time.perf_counter() - start)
+
+    if args.instrument:
+        print_stats(driver.stats())
+
+
+# Statements timed by bench_imports(), what the command line tools load on start
+IMPORTS = (
+    ('packet', 'from packet import Packet'),
+    ('packet.Firmware', 'from packet import Packet; Packet.Firmware.Query'),
+    ('packet.Profile', 'from packet import Packet; Packet.Profile.EffectSettings'),
+    ('driver', 'import driver'),
+    ('daemon', 'import daemon'),
+)
+
+
+def bench_imports(args) -> None:
+    """Times each statement in a fresh interpreter, as a tool starting cold would."""
+    for (name, statement) in IMPORTS:
+        code = "import time; start = time.perf_counter(); %s; print(time.perf_counter() - start)" % statement
+        samples = []
+        for _ in range(args.rounds):
+            output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+            samples.append(float(output.stdout))
+        print("%-24s median %8.2f ms  min %8.2f ms" % (
+            name, statistics.median(samples) * 1000, min(samples) * 1000))
+
+
+def print_stats(stats: dict) -> None:
+    for name, counters in sorted(stats['classes'].items()):
+        print("%s: %d packets, %d errors, %d/%d bytes written/received" % (
+            name, counters['packets'], counters['errors'], counters['bytes_written'], counters['bytes_received']))
+        for stage in STAGES:
+            histogram = counters['stages'][stage]
+            if histogram['count']:
+                print("    %-8s p50 %8.1f us  p95 %8.1f us  p99 %8.1f us  max %8.1f us" % (
+                    stage, histogram['p50'] * 1e6, histogram['p95'] * 1e6, histogram['p99'] * 1e6, histogram['max'] * 1e6))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks against the emulated device.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    transport = commands.add_parser('transport', help='Full state sync, post() vs post_many().')
+    transport.add_argument('--rounds', type=int, default=100)
+    transport.add_argument('--latency', type=float, default=0.0, help='Per packet latency in ms.')
+    transport.add_argument('--jitter', type=float, default=0.0, help='Per packet jitter in ms.')
+    transport.add_argument('--fast', action='store_true', help='Use the fast (unvalidated) packet codec.')
+    transport.add_argument('--lazy', action='store_true', help='Fast codec, decoding fields on access.')
+    transport.add_argument('--instrument', action='store_true', help='Print per stage latencies.')
+    transport.set_defaults(run=bench_transport)
+
+    imports = commands.add_parser('imports', help='Cold import time of the packet package and the tools.')
+    imports.add_argument('--rounds', type=int, default=20)
+    imports.set_defaults(run=bench_imports)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
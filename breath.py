@@ -0,0 +1,164 @@
+import argparse
+import numpy as np
+from color import ColorBuffer
+from debug import validate_range
+from packet import Packet
+from packet.raw import ErrorResponse
+from packet.types import RGB
+
+
+VENDOR_ID = 0x2516
+PRODUCT_ID = 0x0051
+
+
+def positions() -> np.ndarray:
+    """The position (0.0 - 1.0) of each colour within the cycle."""
+    return np.arange(Packet.Profile.BreathPage.COLORS) / Packet.Profile.BreathPage.COLORS
+
+
+def sine(color: RGB, low: float = 0.0, high: float = 1.0) -> ColorBuffer:
+    """Fades a colour in and out along a raised cosine, starting at the low point."""
+    level = low + (high - low) * (1 - np.cos(2 * np.pi * positions())) / 2
+    return ColorBuffer.fill(color, len(level)).scale(level)
+
+
+def exponential(color: RGB, rate: float = 4.0, low: float = 0.0, high: float = 1.0) -> ColorBuffer:
+    """Fades a colour in and out exponentially, which looks closer to linear to the eye.
+
+    Parameters
+    ----------
+    rate : float
+        The steepness of the curve, the higher the longer the colour stays dim.
+
+    """
+
+    validate_range(rate, 0.001, 64)
+    ramp = 1 - np.abs(2 * positions() - 1)
+    level = low + (high - low) * np.expm1(rate * ramp) / np.expm1(rate)
+    return ColorBuffer.fill(color, len(level)).scale(level)
+
+
+def keyframes(frames) -> ColorBuffer:
+    """Interpolates linearly between colours placed along the cycle, wrapping around.
+
+    Parameters
+    ----------
+    frames : iterable
+        (position, colour) pairs, the position from 0.0 to 1.0 and the
+        colour an RGB instance or (r, g, b) tuple.
+
+    """
+
+    frames = sorted(frames, key=lambda frame: frame[0])
+    assert frames, "Expected at least one keyframe"
+    points = np.array([frame[0] for frame in frames], dtype=np.float64)
+    colors = ColorBuffer.from_colors(frame[1] for frame in frames).rgb
+
+    x = positions()
+    mixed = np.stack([np.interp(x, points, colors[:, channel], period=1.0) for channel in range(3)], axis=1)
+    return ColorBuffer(data=np.rint(mixed))
+
+
+class BreathTable:
+    """The breath cycle of a zone, as last written to the device.
+
+       Uploading a new cycle only writes the BreathPages whose bytes
+       changed, the pages are compared as a whole in one pass. The table
+       starts unknown (every page is written), unless read back first.
+
+    Parameters
+    ----------
+    zone : int
+        0 or 1, see BreathPage.
+    extra : int
+        The extra byte of the last page, see ColorBuffer.to_breath().
+
+    """
+
+    def __init__(self, zone: int, extra: int = None):
+        validate_range(zone, 0, 1)
+        self.zone = zone
+        self.extra = extra
+        self.payload = None
+
+    def read(self, driver) -> ColorBuffer:
+        """Reads the cycle held by the device."""
+        BreathPage = Packet.Profile.BreathPage
+        pages = [BreathPage(index, self.zone, Packet.Profile.MODE_READ) for index in range(BreathPage.PAGES)]
+        responses = driver.post_many(pages)
+        for response in responses:
+            if isinstance(response, ErrorResponse):
+                raise IOError("Failed to read the breath cycle of zone %d" % self.zone)
+
+        self.payload = np.frombuffer(b''.join(response.data for response in responses), dtype=np.uint8)
+        return ColorBuffer(data=self.payload[:BreathPage.COLORS * 3])
+
+    def changed(self, colors: ColorBuffer) -> list:
+        """The BreathPages needed to replace the known cycle with the given colours."""
+        return self._pages(np.frombuffer(colors.to_breath(self.extra), dtype=np.uint8))
+
+    def _pages(self, payload: np.ndarray) -> list:
+        BreathPage = Packet.Profile.BreathPage
+        if self.payload is None:
+            indices = range(BreathPage.PAGES)
+        else:
+            indices = np.flatnonzero((payload != self.payload).reshape(BreathPage.PAGES, -1).any(axis=1))
+
+        pages = []
+        for index in indices:
+            page = BreathPage(int(index), self.zone)
+            page.setData(payload[index * BreathPage.SIZE:(index + 1) * BreathPage.SIZE].tobytes())
+            pages.append(page)
+        return pages
+
+    def upload(self, driver, colors: ColorBuffer) -> list:
+        """Writes the changed pages, returns the pages sent."""
+        payload = np.frombuffer(colors.to_breath(self.extra), dtype=np.uint8)
+        pages = self._pages(payload)
+        if not pages:
+            return []
+
+        responses = driver.post_many(pages)
+        if any(isinstance(response, ErrorResponse) for response in responses):
+            # Partially written, the whole cycle is sent the next time
+            self.payload = None
+            raise IOError("Failed to write the breath cycle of zone %d" % self.zone)
+
+        self.payload = payload
+        return pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Uploads a breath cycle.')
+    parser.add_argument('curve', choices=('sine', 'exponential', 'keyframes'))
+    parser.add_argument('colors', nargs='+', help='RRGGBB, the colour of the curve or each keyframe.')
+    parser.add_argument('--zone', type=int, default=0, choices=(0, 1))
+    parser.add_argument('--emulate', action='store_true', help='Upload to an emulated device.')
+    args = parser.parse_args()
+
+    colors = [RGB(bytes.fromhex(color)) for color in args.colors]
+    if args.curve == 'sine':
+        cycle = sine(colors[0])
+    elif args.curve == 'exponential':
+        cycle = exponential(colors[0])
+    else:
+        cycle = keyframes((i / len(colors), color) for i, color in enumerate(colors))
+
+    if args.emulate:
+        from emulator import EmulatedDriver
+        driver = EmulatedDriver()
+    else:
+        from driver import Driver
+        driver = Driver(VENDOR_ID, PRODUCT_ID)
+
+    driver.attach()
+    try:
+        table = BreathTable(args.zone)
+        table.read(driver)
+        print("%d pages written" % len(table.upload(driver, cycle)))
+    finally:
+        driver.detach()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import mmap
+import struct
+import time
+from instrument import Instruments, STAGE_WRITE, STAGE_READ
+from packet.registry import decode_frame
+
+
+VENDOR_ID = 0x2516
+PRODUCT_ID = 0x0051
+
+# File header: magic, version, record size
+HEADER = struct.Struct('<4sHH')
+MAGIC = b'PLTR'
+VERSION = 1
+
+# Record: timestamp (seconds), direction, padding, the 64 raw bytes
+RECORD = struct.Struct('<dB7x64s')
+DIR_OUT = 0
+DIR_IN = 1
+
+
+class Recorder:
+    """Appends every frame a driver sends and receives to a trace file.
+
+       Each frame is stored as a fixed size record holding the time the
+       transfer started (seconds since the epoch), its direction and the 64
+       raw bytes. The spans are timed with perf_counter, whose origin differs
+       per process, so they are shifted by a wall clock base taken when the
+       recorder is created: records appended by different sessions stay
+       comparable. The recorder is a span hook, see Instruments.
+
+    Parameters
+    ----------
+    path : str
+        The trace file, created or appended to.
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.base = time.time() - time.perf_counter()
+        self.driver = None
+        self.count = 0
+
+    def __enter__(self) -> 'Recorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __call__(self, stage: str, request, operation: int, start: float, end: float, data) -> None:
+        if stage == STAGE_WRITE:
+            self.write(self.base + start, DIR_OUT, data)
+        elif stage == STAGE_READ:
+            self.write(self.base + start, DIR_IN, data)
+
+    def write(self, timestamp: float, direction: int, data) -> None:
+        """Appends a single frame, timestamped in seconds since the epoch."""
+        self.file.write(RECORD.pack(timestamp, direction, bytes(data)))
+        self.count += 1
+
+    def attach(self, driver) -> 'Recorder':
+        """Starts recording the traffic of a driver."""
+        if driver.instruments is None:
+            driver.instrument(Instruments(collect=False))
+        driver.instruments.addHook(self)
+        self.driver = driver
+        return self
+
+    def detach(self) -> None:
+        if self.driver is not None:
+            self.driver.instruments.removeHook(self)
+            if not self.driver.instruments.hooks:
+                self.driver.instrument(None)
+            self.driver = None
+
+    def close(self) -> None:
+        self.detach()
+        self.file.close()
+
+
+class Replayer:
+    """Replays a recorded trace against a device (or the emulator).
+
+       The trace is memory mapped and read in place. Only the outgoing
+       frames are sent, the recorded responses are compared against the
+       received ones.
+
+    Parameters
+    ----------
+    path : str
+        The trace file, see Recorder.
+
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, size) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise IOError("%s is not a version %d trace" % (path, VERSION))
+
+    def __enter__(self) -> 'Replayer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self):
+        return (len(self.map) - HEADER.size) // RECORD.size
+
+    def records(self):
+        """Yields (timestamp, direction, data) for every record."""
+        end = HEADER.size + len(self) * RECORD.size
+        return RECORD.iter_unpack(memoryview(self.map)[HEADER.size:end])
+
+    def exchanges(self) -> list:
+        """Pairs every outgoing frame with its recorded response (or None)."""
+        exchanges = []
+        for (timestamp, direction, data) in self.records():
+            if direction == DIR_OUT:
+                exchanges.append([timestamp, data, None])
+            elif exchanges and exchanges[-1][2] is None:
+                exchanges[-1][2] = data
+        return exchanges
+
+    def replay(self, driver, paced: bool = True, timeout=100) -> dict:
+        """Sends the recorded frames to a driver.
+
+        Parameters
+        ----------
+        driver : Driver
+            The driver to replay against.
+        paced : bool
+            Whether to keep the original spacing between transfers, or to
+            stream all frames back to back.
+
+        Returns
+        -------
+        dict
+            The number of frames sent, the elapsed time, and the number of
+            responses which differ from the recorded ones.
+
+        """
+
+        exchanges = self.exchanges()
+        if not exchanges:
+            return {'frames': 0, 'elapsed': 0.0, 'mismatches': 0}
+
+        start = time.perf_counter()
+        if paced:
+            first = exchanges[0][0]
+            responses = []
+            for (timestamp, frame, _) in exchanges:
+                delay = start + (timestamp - first) - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                responses += driver.transfer((frame,), timeout)
+        else:
+            responses = driver.transfer([frame for (_, frame, _) in exchanges], timeout)
+        elapsed = time.perf_counter() - start
+
+        mismatches = sum(1 for (_, _, recorded), response in zip(exchanges, responses)
+                         if recorded is not None and recorded != response)
+
+        return {'frames': len(exchanges), 'elapsed': elapsed, 'mismatches': mismatches}
+
+    def close(self) -> None:
+        self.map.close()
+        self.file.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Dumps or replays packet traces.')
+    parser.add_argument('command', choices=('dump', 'replay'))
+    parser.add_argument('path', help='The trace file.')
+    parser.add_argument('--decode', action='store_true', help='Name the packet of each dumped frame.')
+    parser.add_argument('--fast', action='store_true', help='Replay as fast as possible.')
+    parser.add_argument('--emulate', action='store_true', help='Replay against an emulated device.')
+    args = parser.parse_args()
+
+    with Replayer(args.path) as replayer:
+        if args.command == 'dump':
+            for (timestamp, direction, data) in replayer.records():
+                name = decode_frame(data, lazy=True).displayName() if args.decode else ''
+                print("%14.6f %s %s %s" % (timestamp, '>' if direction == DIR_OUT else '<', data.hex(), name))
+            return
+
+        if args.emulate:
+            from emulator import EmulatedDriver
+            driver = EmulatedDriver(cache=False)
+        else:
+            from driver import Driver
+            driver = Driver(VENDOR_ID, PRODUCT_ID, cache=False)
+
+        driver.attach()
+        try:
+            result = replayer.replay(driver, not args.fast)
+        finally:
+            driver.detach()
+
+        print("%d frames in %.3f ms, %d responses differ" % (
+            result['frames'], result['elapsed'] * 1000, result['mismatches']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import socket
+import argparse
+from struct import pack, unpack
+
+
+# Kept free of the packet/usb imports, so short invocations start quickly
+SOCKET_PATH = os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'), 'plasma.sock')
+
+# Each message is a kind byte and a little endian length, followed by the payload
+KIND_PACKETS = b'P'   # Concatenated 64 byte frames, answered with the raw responses
+KIND_COMMAND = b'C'   # A text command, answered with text
+KIND_ERROR = b'E'     # Text, the request failed
+
+
+def send_message(sock: socket.socket, kind: bytes, payload: bytes) -> None:
+    sock.sendall(kind + pack('<I', len(payload)) + payload)
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def recv_message(sock: socket.socket) -> tuple:
+    header = recv_exactly(sock, 5)
+    if header is None:
+        return None, None
+    (size,) = unpack('<I', header[1:])
+    return header[:1], recv_exactly(sock, size)
+
+
+class Client:
+    """Talks to a running Daemon.
+
+    Parameters
+    ----------
+    path : str
+        The socket path.
+
+    """
+
+    def __init__(self, path: str = SOCKET_PATH):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def _request(self, kind: bytes, payload: bytes) -> bytes:
+        send_message(self.sock, kind, payload)
+        kind, reply = recv_message(self.sock)
+        if kind is None:
+            raise IOError("Connection closed by the daemon")
+        if kind == KIND_ERROR:
+            raise RuntimeError(reply.decode('utf-8'))
+        return reply
+
+    def transfer(self, frames) -> list:
+        """Sends raw 64 byte frames, returns the raw responses."""
+        reply = self._request(KIND_PACKETS, b''.join(bytes(frame) for frame in frames))
+        return [reply[i:i + 64] for i in range(0, len(reply), 64)]
+
+    def command(self, line: str) -> str:
+        return self._request(KIND_COMMAND, line.encode('utf-8')).decode('utf-8')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Sends a command to a running daemon.py.')
+    parser.add_argument('--socket', default=SOCKET_PATH, help='The socket path.')
+    parser.add_argument('words', nargs='+', help='e.g. "fan color ff0000" or "ring get"')
+    args = parser.parse_args()
+
+    with Client(args.socket) as client:
+        try:
+            print(client.command(' '.join(args.words)))
+        except RuntimeError as error:
+            sys.exit(str(error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+import numpy as np
+from packet import Packet
+from packet.types import RGB
+
+
+# Lookup tables of ColorBuffer.gamma(), by exponent
+GAMMA = {}
+
+
+def _rgb(value: bytes) -> RGB:
+    """Wraps 3 bytes known to be valid, skipping the checks of RGB()."""
+    color = RGB.__new__(RGB)
+    color.value = value
+    return color
+
+
+def hsv_to_rgb(hsv) -> np.ndarray:
+    """Converts N x 3 hue, saturation and value (0.0 - 1.0) to N x 3 uint8 colours."""
+    hsv = np.asarray(hsv, dtype=np.float64).reshape(-1, 3)
+    h = hsv[:, 0] % 1.0 * 6
+    s = np.clip(hsv[:, 1], 0.0, 1.0)
+    v = np.clip(hsv[:, 2], 0.0, 1.0)
+
+    sector = h.astype(np.intp) % 6
+    f = h - np.floor(h)
+    p = v * (1 - s)
+    q = v * (1 - s * f)
+    t = v * (1 - s * (1 - f))
+
+    rgb = np.empty((len(hsv), 3))
+    rgb[:, 0] = np.choose(sector, (v, q, p, p, t, v))
+    rgb[:, 1] = np.choose(sector, (t, v, v, q, p, p))
+    rgb[:, 2] = np.choose(sector, (p, p, t, v, v, q))
+    return np.rint(rgb * 255).astype(np.uint8)
+
+
+def rgb_to_hsv(rgb) -> np.ndarray:
+    """Converts N x 3 uint8 colours to N x 3 hue, saturation and value (0.0 - 1.0)."""
+    rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255
+    (r, g, b) = (rgb[:, 0], rgb[:, 1], rgb[:, 2])
+
+    high = rgb.max(axis=1)
+    low = rgb.min(axis=1)
+    delta = high - low
+    # Grey colours have no hue, the divisions are guarded and masked out below
+    safe = np.where(delta > 0, delta, 1.0)
+
+    h = np.where(high == r, (g - b) / safe,
+                 np.where(high == g, 2.0 + (b - r) / safe, 4.0 + (r - g) / safe))
+    h = np.where(delta > 0, (h / 6.0) % 1.0, 0.0)
+    s = np.where(high > 0, delta / np.where(high > 0, high, 1.0), 0.0)
+    return np.stack((h, s, high), axis=1)
+
+
+class ColorBuffer:
+    """A run of colours held in a single uint8 array.
+
+       The colours are stored back to back (r, g, b, r, g, b...) as sent to
+       the device, 'rgb' is a N x 3 view of the same memory. Every operation
+       works on the whole buffer at once, and serializing only copies bytes,
+       no RGB object is created per colour.
+
+    Parameters
+    ----------
+    count : int
+        The number of (black) colours, ignored when data is given.
+    data : array_like
+        The colours, N x 3 or flat, as values 0-255.
+
+    """
+
+    def __init__(self, count: int = 0, data=None):
+        if data is None:
+            self.data = np.zeros(count * 3, dtype=np.uint8)
+        else:
+            self.data = np.ascontiguousarray(data, dtype=np.uint8).reshape(-1)
+            assert len(self.data) % 3 == 0, "Expected whole colours, got %d bytes" % len(self.data)
+        self.rgb = self.data.reshape(-1, 3)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ColorBuffer':
+        return cls(data=np.frombuffer(data, dtype=np.uint8))
+
+    @classmethod
+    def from_colors(cls, colors) -> 'ColorBuffer':
+        """Packs RGB instances, or (r, g, b) tuples."""
+        return cls(data=np.frombuffer(b''.join(bytes(color) for color in colors), dtype=np.uint8))
+
+    @classmethod
+    def from_hsv(cls, hsv) -> 'ColorBuffer':
+        """N x 3 hue, saturation and value, each 0.0 - 1.0."""
+        return cls(data=hsv_to_rgb(hsv))
+
+    @classmethod
+    def fill(cls, color, count: int) -> 'ColorBuffer':
+        """The same colour repeated."""
+        return cls(data=np.tile(np.frombuffer(bytes(color), dtype=np.uint8), count))
+
+    def __len__(self):
+        return len(self.rgb)
+
+    def __getitem__(self, selection) -> 'ColorBuffer':
+        """The selected colours, by slice, mask or indices."""
+        if isinstance(selection, int):
+            selection = [selection]
+        return ColorBuffer(data=self.rgb[selection])
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ColorBuffer) and np.array_equal(self.data, other.data)
+
+    def __bytes__(self):
+        return self.data.tobytes()
+
+    def color(self, index: int) -> RGB:
+        """A single colour as an RGB instance."""
+        return _rgb(self.rgb[index].tobytes())
+
+    def hsv(self) -> np.ndarray:
+        """The colours as N x 3 hue, saturation and value, see rgb_to_hsv()."""
+        return rgb_to_hsv(self.rgb)
+
+    def blend(self, other: 'ColorBuffer', alpha) -> 'ColorBuffer':
+        """Mixes in another buffer of the same length.
+
+        Parameters
+        ----------
+        other : ColorBuffer
+            The colours blended in.
+        alpha : float|array_like
+            The weight of the other colours (0.0 - 1.0), either for the whole
+            buffer or per colour.
+
+        """
+
+        assert len(other) == len(self), "Expected %d colours, got %d" % (len(self), len(other))
+        alpha = np.asarray(alpha, dtype=np.float64)
+        if alpha.ndim:
+            alpha = alpha.reshape(-1, 1)
+        mixed = self.rgb + (other.rgb.astype(np.float64) - self.rgb) * alpha
+        return ColorBuffer(data=np.rint(np.clip(mixed, 0, 255)))
+
+    def scale(self, brightness) -> 'ColorBuffer':
+        """Scales the colours by a brightness (0.0 - 1.0), for the whole buffer or per colour."""
+        brightness = np.asarray(brightness, dtype=np.float64)
+        if brightness.ndim:
+            brightness = brightness.reshape(-1, 1)
+        return ColorBuffer(data=np.rint(np.clip(self.rgb * brightness, 0, 255)))
+
+    def gamma(self, exponent: float = 2.2) -> 'ColorBuffer':
+        """Applies a gamma curve, through a 256 entry lookup table."""
+        table = GAMMA.get(exponent)
+        if table is None:
+            table = GAMMA[exponent] = np.rint(
+                (np.arange(256) / 255.0) ** exponent * 255).astype(np.uint8)
+        return ColorBuffer(data=table[self.data])
+
+    def to_settings(self, settings: Packet.Profile.EffectSettings, index: int = 0) -> None:
+        """Writes the colours starting at index into the RGB slots of an EffectSettings."""
+        for slot in range(1, min(3, len(self) - index + 1)):
+            settings.setRGB(slot, _rgb(self.rgb[index + slot - 1].tobytes()))
+
+    def to_breath(self, extra: int = None) -> bytes:
+        """Lays out a whole breath cycle, the payloads of the 5 BreathPages back to back.
+
+        Parameters
+        ----------
+        extra : int
+            The extra byte following the colours of the last page, see
+            BreathPage. Defaults to the red of the first colour, as if the
+            cycle wrapped around.
+
+        """
+
+        BreathPage = Packet.Profile.BreathPage
+        assert len(self) == BreathPage.COLORS, "Expected %d colours, got %d" % (BreathPage.COLORS, len(self))
+
+        payload = np.zeros(BreathPage.PAGES * BreathPage.SIZE, dtype=np.uint8)
+        payload[:len(self.data)] = self.data
+        payload[len(self.data)] = self.data[0] if extra is None else extra
+        return payload.tobytes()
+
+    def to_breath_pages(self, zone: int, extra: int = None) -> list:
+        """The 5 BreathPage packets writing the cycle of a zone (0 or 1), see to_breath()."""
+        BreathPage = Packet.Profile.BreathPage
+        payload = self.to_breath(extra)
+        pages = []
+        for index in range(BreathPage.PAGES):
+            page = BreathPage(index, zone)
+            page.setData(payload[index * BreathPage.SIZE:(index + 1) * BreathPage.SIZE])
+            pages.append(page)
+        return pages
@@ -0,0 +1,224 @@
+import os
+import sys
+import signal
+import argparse
+import threading
+import socketserver
+from client import SOCKET_PATH, KIND_PACKETS, KIND_COMMAND, KIND_ERROR, send_message, recv_message
+from packet.types import RGB
+from effects import Static, Rainbow, Swirl, Chase, Bounce, Morse, Cycle, Breathing, Off, Speed, Brightness
+from state import ZONE_ID_LOGO, ZONE_ID_FAN
+
+
+VENDOR_ID = 0x2516
+PRODUCT_ID = 0x0051
+
+EFFECTS = {
+    'static': (Static, 0x00),
+    'rainbow': (Rainbow, 0x07),
+    'swirl': (Swirl, 0x0A),
+    'chase': (Chase, 0x09),
+    'bounce': (Bounce, 0x08),
+    'morse': (Morse, 0x0B),
+    'cycle': (Cycle, 0x02),
+    'breathing': (Breathing, 0x01),
+    'off': (Off, None),
+}
+
+
+class Commands:
+    """Executes text commands against the cached state of a driver.
+
+       <zone> get
+       <zone> effect <name>
+       <zone> color <RRGGBB>
+       <zone> speed <1-5>
+       <zone> brightness <1-3>
+       sync
+
+       Where zone is one of ring, logo or fan. Changes are committed in a
+       single transaction.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def execute(self, line: str) -> str:
+        words = line.split()
+        if not words:
+            raise ValueError("Empty command")
+
+        if words[0].lower() == 'sync':
+            self.driver.state.fill(self.driver)
+            return 'ok'
+
+        if len(words) < 2:
+            raise ValueError("Expected a command for '%s'" % words[0])
+        zone = self._zone(words[0].lower())
+        name = words[1].lower()
+
+        if name == 'get':
+            return self._describe(zone)
+
+        if len(words) != 3:
+            raise ValueError("Expected a value for '%s'" % name)
+        value = words[2]
+
+        with self.driver.transaction() as transaction:
+            transaction.add(zone)
+            if name == 'effect':
+                zone.applyEffect(self._effect(words[0].lower(), value.lower()))
+            elif name == 'color':
+                self._require(zone, 'Color').setColor(RGB(bytes.fromhex(value)))
+            elif name == 'speed':
+                self._require(zone, 'Speed').setSpeed(Speed(int(value)))
+            elif name == 'brightness':
+                self._require(zone, 'Brightness').setBrightness(Brightness(int(value)))
+            else:
+                raise ValueError("Unknown command '%s'" % name)
+
+        return 'ok'
+
+    def _zone(self, name: str):
+        state = self.driver.state
+        if name == 'ring':
+            return state.getRing()
+        if name == 'logo':
+            return state.getLogo()
+        if name == 'fan':
+            return state.getFan()
+        raise ValueError("Unknown zone '%s'" % name)
+
+    def _effect(self, zone: str, name: str):
+        if name not in EFFECTS:
+            raise ValueError("Unknown effect '%s'" % name)
+        (effect, id) = EFFECTS[name]
+
+        if zone == 'logo':
+            id = ZONE_ID_LOGO
+        elif zone == 'fan':
+            id = ZONE_ID_FAN
+        elif id is None:
+            id = 0x00
+
+        return effect(self.driver.state.getSettings(id))
+
+    def _require(self, zone, caps: str):
+        if not getattr(zone.effect.getCaps(), caps)():
+            raise ValueError("Effect %s has no %s setting" % (type(zone.effect).__name__, caps.lower()))
+        return zone.effect
+
+    def _describe(self, zone) -> str:
+        effect = zone.effect
+        caps = effect.getCaps()
+        fields = ['effect=%s' % type(effect).__name__.lower()]
+        if caps.Color():
+            fields.append('color=%s' % bytes(effect.getColor()).hex())
+        if caps.Speed():
+            fields.append('speed=%d' % effect.getSpeed().level)
+        if caps.Brightness():
+            fields.append('brightness=%d' % effect.getBrightness().level)
+        return ' '.join(fields)
+
+
+class Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server
+        while True:
+            kind, payload = recv_message(self.request)
+            if kind is None or payload is None:
+                return
+
+            try:
+                with server.lock:
+                    if kind == KIND_PACKETS:
+                        if len(payload) % 64:
+                            raise ValueError("Expected 64 byte frames, got %d bytes" % len(payload))
+                        frames = [payload[i:i + 64] for i in range(0, len(payload), 64)]
+                        reply = b''.join(server.driver.transfer(frames))
+                    elif kind == KIND_COMMAND:
+                        reply = server.commands.execute(payload.decode('utf-8')).encode('utf-8')
+                    else:
+                        raise ValueError("Unknown message kind %r" % kind)
+            except Exception as error:
+                send_message(self.request, KIND_ERROR, str(error).encode('utf-8'))
+            else:
+                send_message(self.request, kind, reply)
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Keeps the device claimed and its state cached between clients.
+
+       Clients may send raw packets or text commands (see Commands) over a
+       Unix socket. All requests share a single attached Driver, the USB
+       traffic of concurrent clients is serialized.
+
+    Parameters
+    ----------
+    driver : Driver
+        The driver to serve, attached on start.
+    path : str
+        The socket path.
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, driver, path: str = SOCKET_PATH):
+        if os.path.exists(path):
+            os.unlink(path)
+
+        super().__init__(path, Handler)
+        self.path = path
+        self.driver = driver
+        self.commands = Commands(driver)
+        self.lock = threading.Lock()
+
+        if driver.device is None:
+            try:
+                driver.attach()
+            except BaseException:
+                # Do not leave a socket nobody serves behind
+                self.server_close()
+                raise
+
+    def server_bind(self):
+        # The socket is only accessible to its owner, it is created so rather
+        # than restricted once bound
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        super().server_close()
+        self.driver.detach()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Resident daemon holding the cooler, see client.py.')
+    parser.add_argument('--socket', default=SOCKET_PATH, help='The socket path.')
+    parser.add_argument('--emulate', action='store_true', help='Serve an emulated device.')
+    args = parser.parse_args()
+
+    if args.emulate:
+        from emulator import EmulatedDriver
+        driver = EmulatedDriver()
+    else:
+        from driver import Driver
+        driver = Driver(VENDOR_ID, PRODUCT_ID)
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    with Daemon(driver, args.socket) as daemon:
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,98 @@
-import inspect
+import sys
+
+
+def extract_stack(level: int = 2, frame=None) -> tuple:
+    """Records the call stack, from the caller up to the outermost frame.
+
+       The frame is either given, or taken 'level' frames above this one.
+       Only the (filename, line, function) of each frame is kept, no frame
+       is referenced once this returns.
+    """
+    if frame is None:
+        frame = sys._getframe(level)
+
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    return tuple(stack)
+
+
+def get_caller(level: int = 2, stack: tuple = None):
+    """Formats the call stack, from the outermost frame down to the caller, see extract_stack()."""
+    if stack is None:
+        stack = extract_stack(level + 1)
+
+    history = ['    File "%s", line %d, in %s' % entry for entry in reversed(stack)]
+
+    # Only needed once an error is rendered, linecache pulls in tokenize and re
+    import linecache
+    (filename, lineno, _) = stack[0]
+    line = linecache.getline(filename, lineno)
+    return '\n'.join(history) + '\n        %s' % line.strip()
+
+
+class ValidationError(AssertionError):
+    """Raised by the validate functions.
+
+       Only the failing values and the call stack (see extract_stack()) are
+       stored, the message and the source lines are formatted when the error
+       is rendered.
+
+    Parameters
+    ----------
+    msg : str
+        The message, $0, $1... are replaced by the corresponding args.
+    args : tuple
+        The values substituted into the message.
+    field : str
+        The name of the validated field, if known.
+    expected : object
+        The expected value (or type or range).
+    actual : object
+        The value found.
+    stack : tuple
+        The call stack of the validate function, see extract_stack().
+
+    """
+
+    def __init__(self, msg: str, args: tuple, field: str = None, expected=None, actual=None, stack=None):
+        super().__init__(msg)
+        self.msg = msg
+        self.values = args
+        self.field = field
+        self.expected = expected
+        self.actual = actual
+        self.stack = stack
+
+    def __str__(self):
+        error = self.msg
+        # Replaced in reverse so that $1 does not match the start of $10
+        for i in reversed(range(len(self.values))):
+            error = error.replace('$%d' % i, str(self.values[i]))
+        if self.field is not None:
+            error = '%s: %s' % (self.field, error)
+        if self.stack:
+            error += '\n' + get_caller(stack=self.stack)
+        return error
+
+
+def fail(msg: str, args: tuple, throw: bool = True, field: str = None, expected=None, actual=None,
+         level: int = 2) -> bool:
+    """Raises (or prints) a ValidationError for the frame 'level' frames above the validator."""
+    error = ValidationError(msg, args, field, expected, actual, extract_stack(level + 1))
 
+    if throw:
+        raise error
 
-def get_caller(level: int = 2):
-    stack = inspect.stack()
-    curr = len(stack) - 1
-    history = []
-    while curr >= level:
-        frame = stack[curr][0]
-        (filename, line_number, function_name, lines, index) = inspect.getframeinfo(frame)
-        history.append('    File "%s", line %d, in %s' % (filename, line_number, function_name))
-        curr -= 1
-
-    return '\n'.join(history) + '\n        %s' % lines[0].strip()
+    print(error)
+    return False
 
 
-def validate(value, expected, msg: str = "Expected $1, got $0"):
+def validate(value, expected, msg: str = "Expected $1, got $0", field: str = None):
     if value != expected:
-        error = msg + "\n" + get_caller()
-        error = error.replace('$0', str(value))
-        error = error.replace('$1', str(expected))
-
-        raise AssertionError(error)
+        fail(msg, (value, expected), field=field, expected=expected, actual=value)
 
     return value
 
@@ -30,24 +102,13 @@ def validate_type(value, types, throw: bool = True, msg: str = "Expected $1, got
         for _type in types:
             if isinstance(value, _type):
                 return True
-        t = []
-        for _type in types:
-            t.append(_type.__name__)
-        expected = '[' + ', '.join(t) + ']'
+        expected = '[' + ', '.join(_type.__name__ for _type in types) + ']'
     elif isinstance(value, types):
         return True
     else:
         expected = types.__name__
 
-    error = msg + "\n" + get_caller()
-    error = error.replace('$0', type(value).__name__)
-    error = error.replace('$1', expected)
-
-    if throw:
-        raise AssertionError(error)
-
-    print(error)
-    return False
+    return fail(msg, (type(value).__name__, expected), throw, expected=types, actual=value)
 
 
 def validate_range(value, min, max, throw: bool = True, msg: str = "Value ($0) out of range: $1 - $2") -> bool:
@@ -55,16 +116,7 @@ def validate_range(value, min, max, throw: bool = True, msg: str = "Value ($0) o
     if value >= min and value <= max:
         return True
 
-    error = msg + "\n" + get_caller()
-    error = error.replace('$0', str(value))
-    error = error.replace('$1', str(min))
-    error = error.replace('$2', str(max))
-
-    if throw:
-        raise AssertionError(error)
-
-    print(error)
-    return False
+    return fail(msg, (value, min, max), throw, expected=(min, max), actual=value)
 
 
 def validate_lower(value, target, throw: bool = True, msg: str = "Value ($0) out of range: X - $1") -> bool:
@@ -72,15 +124,7 @@ def validate_lower(value, target, throw: bool = True, msg: str = "Value ($0) out
     if value < target:
         return True
 
-    error = msg + "\n" + get_caller()
-    error = error.replace('$0', str(value))
-    error = error.replace('$1', str(target))
-
-    if throw:
-        raise AssertionError(error)
-
-    print(error)
-    return False
+    return fail(msg, (value, target), throw, expected=target, actual=value)
 
 
 def validate_higher(value, target, throw: bool = True, msg: str = "Value ($0) out of range: X - $1") -> bool:
@@ -88,40 +132,21 @@ def validate_higher(value, target, throw: bool = True, msg: str = "Value ($0) ou
     if value > target:
         return True
 
-    error = msg + "\n" + get_caller()
-    error = error.replace('$0', str(value))
-    error = error.replace('$1', str(target))
+    return fail(msg, (value, target), throw, expected=target, actual=value)
 
-    if throw:
-        raise AssertionError(error)
 
-    print(error)
-    return False
-
-
-def validate_tuple(value, expected, throw: bool = True, msg: str = "Expected offset $3 to be $0, got $1") -> bool:
+def validate_tuple(value, expected, throw: bool = True, msg: str = "Expected offset $2 to be $1, got $0") -> bool:
     validate_type(value, tuple)
     validate_type(expected, tuple)
     validate_length(value, len(expected), level=3)
-    error = None
     for key in range(len(value)):
         if isinstance(value[key], expected[key]):
             continue
 
-        error = msg + "\n" + get_caller()
-        error = error.replace('$0', type(value[key]).__name__)
-        error = error.replace('$1', expected[key].__name__)
-        error = error.replace('$2', str(key))
-
-        break
-
-    if error is None:
-        return True
-    if throw:
-        raise AssertionError(error)
+        return fail(msg, (type(value[key]).__name__, expected[key].__name__, key), throw,
+                    expected=expected[key], actual=value[key])
 
-    print(error)
-    return False
+    return True
 
 
 def validate_length(value, expected: int, throw: bool = True,
@@ -129,12 +154,4 @@ def validate_length(value, expected: int, throw: bool = True,
     if len(value) == expected:
         return True
 
-    error = msg + "\n" + get_caller()
-    error = error.replace('$0', str(len(value)))
-    error = error.replace('$1', str(expected))
-
-    if throw:
-        raise AssertionError(error)
-
-    print(error)
-    return False
+    return fail(msg, (len(value), expected), throw, expected=expected, actual=len(value), level=level)
@@ -1,19 +1,101 @@
 import usb.core
+import types
+from array import array
 from packet import Packet
+from packet.raw import ErrorResponse
+from state import DeviceState
+from transaction import Transaction
+
+# The mode of drivers created without an explicit one, see Driver
+STRICT = True
+
+
+def encode_strict(packet, target) -> None:
+    packet.to_blob(target)
+
+
+def decode_strict(packet, data):
+    return packet.update(data)
+
+
+def encode_fast(packet, target) -> None:
+    packet.pack_into(target)
+
+
+def decode_fast(packet, data):
+    return packet.unpack(data)
+
+
+def decode_lazy(packet, data):
+    return packet.load(data)
 
 
 class Driver:
-    def __init__(self, vendorId, productId, interface=1):
+    """Talks to the cooler over USB.
+
+    Parameters
+    ----------
+    strict : bool
+        Strict mode validates every field of every packet, as needed while
+        reverse engineering the protocol. Fast mode packs and unpacks the
+        packets with their precompiled layouts and trusts the responses.
+        Defaults to the module level STRICT.
+    lazy : bool
+        In fast mode, keep the raw responses and only decode the fields
+        which are accessed (see Packet.Raw.load).
+
+    """
+
+    def __init__(self, vendorId, productId, interface=1, cache=True, usbDevice=None, strict=None,
+                 lazy=False):
         self.vendorId = vendorId
         self.productId = productId
         self.interfaceNum = interface
+        self.usbDevice = usbDevice  # Claims this device rather than the first match
         self.device = None
+        self.state = DeviceState() if cache else None
+        self.instruments = None
+
+        # The codec is bound once, rather than checking the mode per packet
+        self.strict = STRICT if strict is None else strict
+        if self.strict:
+            self.encode = encode_strict
+            self.decode = decode_strict
+        else:
+            self.encode = encode_fast
+            self.decode = decode_lazy if lazy else decode_fast
+
+        # Transfer buffers are reused across calls, grown on demand by post_many()
+        self.outgoing = bytearray(64)
+        self.incoming = [array('B', bytes(64))]
 
     def __del__(self):
         self.detach()
 
     def attach(self):
-        self.device = usb.core.find(idVendor=self.vendorId, idProduct=self.productId)
+        """Claims the device and fills the state cache.
+
+           When either fails, whatever was claimed is released before the
+           error is raised.
+        """
+        try:
+            self._claim()
+
+            if self.state is not None:
+                self.state.fill(self)
+        except BaseException:
+            try:
+                self.detach()
+            except usb.core.USBError:
+                # The error worth raising is the one which failed the attach
+                pass
+            raise
+
+    def _claim(self):
+        if self.usbDevice is not None:
+            self.device = self.usbDevice
+        else:
+            self.device = usb.core.find(idVendor=self.vendorId, idProduct=self.productId)
 
         if self.device is None:
             raise RuntimeError("Failed to find device %s:%s" % (self.vendorId, self.productId))
@@ -52,8 +134,10 @@ class Driver:
 
     def detach(self):
         if self.device is not None:
-            usb.util.release_interface(self.device, self.interface)
-            self.device.attach_kernel_driver(self.interface.bInterfaceNumber)
+            # The interface is only set once _claim() got that far
+            if self.interface is not None:
+                usb.util.release_interface(self.device, self.interface)
+                self.device.attach_kernel_driver(self.interface.bInterfaceNumber)
 
             self.reader = None
             self.writer = None
@@ -61,17 +145,204 @@ class Driver:
             self.device = None
 
     def post(self, request, timeout=100):
+        return self.post_many((request,), timeout)[0]
+
+    def post_many(self, requests, timeout=100) -> list:
+        """Sends a batch of packets back to back.
+
+           All packets are encoded up front and streamed without decoding in
+           between. The responses are only checked once the whole batch has
+           been transferred.
+
+        Parameters
+        ----------
+        requests : iterable
+            The Packet.Raw instances to send, in order.
+        timeout : int
+            The timeout, in milliseconds, of each individual transfer.
+
+        Returns
+        -------
+        list
+            The decoded response (or an ErrorResponse) for each request.
+
+        """
+
+        requests = list(requests)
+        for request in requests:
+            assert isinstance(request, Packet.Raw), "Expected a Packet, got %s" % type(request)
+
+        decode = self._decodeFrame
+        return [decode(request, response) for request, response in zip(requests, self.transfer(requests, timeout))]
+
+    def transfer(self, frames, timeout=100) -> list:
+        """Sends raw 64 byte frames back to back, see post_many().
+
+           Each frame goes through _encodeFrame(), _writeFrame(),
+           _readFrame() and _collectFrame(), the hook points of instrument().
+
+        Parameters
+        ----------
+        frames : iterable
+            The encoded packets (or Packet.Raw instances) to send, in order.
+        timeout : int
+            The timeout, in milliseconds, of each individual transfer.
+
+        Returns
+        -------
+        list
+            The raw 64 byte response for each frame.
+
+        """
+
         if self.device is None:
             self.attach()
 
-        assert isinstance(request, Packet.Raw), "Expected a Packet, got %s" % type(request)
+        frames = list(frames)
+        count = self._prepare(frames)
+        outgoing = memoryview(self.outgoing)
+        incoming = self.incoming
+        write = self._writeFrame
+        read = self._readFrame
+        offset = 0
+        for i in range(count):
+            write(frames[i], outgoing[offset:offset + 64], timeout)
+            read(frames[i], incoming[i], timeout)
+            offset += 64
+
+        collect = self._collectFrame
+        return [collect(frames[i], incoming[i]) for i in range(count)]
+
+    def _prepare(self, frames: list) -> int:
+        """Encodes or copies the frames into the output buffer, returns their count.
+
+           Packets are encoded in place, the buffer is then handed to the
+           USB write as is.
+        """
+        count = len(frames)
+
+        if len(self.outgoing) < count * 64:
+            self.outgoing = bytearray(count * 64)
+        while len(self.incoming) < count:
+            self.incoming.append(array('B', bytes(64)))
+
+        outgoing = memoryview(self.outgoing)
+        encode = self._encodeFrame
+        offset = 0
+        for frame in frames:
+            encode(frame, outgoing[offset:offset + 64])
+            offset += 64
+
+        return count
 
-        written = self.writer.write(bytes(request), timeout)
-        if written is not 64:
+    def _encodeFrame(self, frame, target) -> None:
+        """Encodes a packet, or copies a raw frame, into its 64 bytes of the output buffer."""
+        if isinstance(frame, Packet.Raw):
+            self.encode(frame, target)
+        else:
+            target[:] = frame
+
+    def _writeFrame(self, frame, data, timeout) -> None:
+        """Writes the 64 encoded bytes of a frame."""
+        written = self.writer.write(data, timeout)
+        if written != 64:
             raise RuntimeError("Incorrect number of bytes written: %d" % written)
 
-        response = self.reader.read(64, timeout)
-        if len(response) is not 64:
-            raise IOError("Expected a 64 byte response, got %d" % len(response))
+    def _readFrame(self, frame, buffer, timeout) -> None:
+        """Reads the response to a frame into its input buffer."""
+        received = self.reader.read(buffer, timeout)
+        if received != 64:
+            raise IOError("Expected a 64 byte response, got %d" % received)
+
+    def _collectFrame(self, frame, buffer) -> bytes:
+        """Returns a received response, updating the state cache."""
+        response = buffer.tobytes()
+        if self.state is not None and not (response[0] == 0xFF and response[1] == 0xAA):
+            self.state.update(response)
+        return response
+
+    def _decodeFrame(self, request, response: bytes):
+        """Decodes the response to a request, see post_many()."""
+        if response[0] == 0xFF and response[1] == 0xAA:
+            return ErrorResponse(response)
+        return self.decode(request, response)
+
+    def pending(self, packets) -> list:
+        """Filters out the packets which need writing to the device.
+
+           Only packets flagged as dirty by their setters, whose encoded bytes
+           differ from the cached device state, are returned. The returned
+           packets are switched to MODE_WRITE, the others are marked clean.
+        """
+
+        changed = []
+        for packet in packets:
+            if not packet.dirty:
+                continue
+            packet.setMode(Packet.Profile.MODE_WRITE)
+            if self.state is None or self.state.differs(bytes(packet)):
+                changed.append(packet)
+            else:
+                packet.dirty = False
+
+        return changed
+
+    def flush(self, packets, timeout=100) -> list:
+        """Writes the modified packets to the device.
+
+           See pending(). The dirty flag is cleared once a packet is
+           acknowledged by the device.
+
+        Parameters
+        ----------
+        packets : iterable
+            The Packet.Profile packets which may have been modified.
+
+        Returns
+        -------
+        list
+            The packets which were actually sent.
+
+        """
+
+        changed = self.pending(packets)
+        if changed:
+            for packet, response in zip(changed, self.post_many(changed, timeout)):
+                if not isinstance(response, ErrorResponse):
+                    packet.dirty = False
+
+        return changed
+
+    def transaction(self, store: bool = False) -> Transaction:
+        """Collects changes to zones and effects, see Transaction."""
+        return Transaction(self, store)
+
+    def instrument(self, instruments=None) -> None:
+        """Installs (or with None, removes) transport instrumentation.
+
+           Timed versions of the per frame steps of transfer() and
+           post_many() (_encodeFrame() to _decodeFrame()) are bound in place
+           of the plain ones, without instruments the plain methods run
+           untouched.
+
+        Parameters
+        ----------
+        instruments : instrument.Instruments
+            Collects the stage timings and calls the span hooks.
+
+        """
+
+        import instrument
+
+        self.instruments = instruments
+        for name in instrument.HOOKS:
+            if instruments is None:
+                self.__dict__.pop(name, None)
+            else:
+                setattr(self, name, types.MethodType(instrument.HOOKS[name], self))
 
-        return request.update(bytes(response))
+    def stats(self) -> dict:
+        """The statistics collected by the installed instruments, see instrument()."""
+        if self.instruments is None:
+            return {}
+        return self.instruments.stats()
@@ -73,14 +73,16 @@ class Speed(BYTE):
         1: 0x96, 2: 0x8C, 3: 0x80, 4: 0x6E, 5: 0x68
     })
 
+    def __new__(self, value, profile: int = None):
+        return super(Speed, self).__new__(self, value)
+
     def __init__(self, value, profile: int = None):
         self.level = 5
         if isinstance(profile, int):
             validate_type(value, BYTE)
-            for level in Speed.profiles[profile]:
-                if Speed.profiles[profile][level] & value:
-                    self.level = level
-                    break
+            # The device may report bytes between the levels, the nearest level is taken
+            levels = Speed.profiles[profile]
+            self.level = min(levels, key=lambda level: abs(levels[level] - value))
         else:
             self.level = max(1, min(5, value))
 
@@ -104,14 +106,16 @@ class Brightness(BYTE):
         1: 0x10, 2: 0x40, 3: 0x7F
     })
 
+    def __new__(self, value, profile: int = None):
+        return super(Brightness, self).__new__(self, value)
+
     def __init__(self, value, profile: int = None):
         self.level = 5
         if isinstance(profile, int):
             validate_type(value, BYTE)
-            for level in Brightness.profiles[profile]:
-                if Brightness.profiles[profile][level] & value:
-                    self.level = level
-                    break
+            # The device may report bytes between the levels, the nearest level is taken
+            levels = Brightness.profiles[profile]
+            self.level = min(levels, key=lambda level: abs(levels[level] - value))
         else:
             self.level = max(1, min(3, value))
 
@@ -382,77 +386,129 @@ class Morse(Static):
             '/': '-..-.', '-': '-....-', '(': '-.--.', ')': '-.--.-', ' ': ' '
         }
 
-        def encode(message: str) -> str:
+        # Built once from the alphabet, see the end of this module
+        CODES = {}     # character -> (2 bit symbols, bit count), including the trailing space
+        TABLE = {}     # dots and dashes -> character, used by decode()
+        SYMBOLS = {}   # dot, dash or space -> 2 bit symbol
+        BYTES = ()     # byte -> (its symbols as text, whether it holds the end)
+
+        PAGE_SIZE = 60
+        SIZE = 120     # Two pages, the active ones or a memory slot
+
+        def encode(message: str, size: int = 60) -> str:
             # 60 bytes are available with each bytes able to store 4 code points.
             # Max length of output is 60 * 4 - 1 (for the terminating 0x03)
             # Discard any ascii letters which run over this size
 
-            maxlen = (60 * 4) - 1
+            maxlen = (size * 4) - 1
             currlen = 0
-            code = ''
+            code = []
             for char in message.upper():
-                if char in Morse.Encoder.ALPHABET:
-                    sequence = Morse.Encoder.ALPHABET[char] + ' '
-                    seqlen = len(sequence)
+                sequence = Morse.Encoder.ALPHABET.get(char)
+                if sequence is not None:
+                    seqlen = len(sequence) + 1
                     if currlen + seqlen > maxlen:
                         break
-                    code += sequence
+                    code.append(sequence)
                     currlen += seqlen
                 # silently skip unknown characters
-            return code
+            return ''.join(sequence + ' ' for sequence in code)
 
         def decode(code: str) -> str:
-            table = dict((v, k) for k, v in Morse.Encoder.ALPHABET.items())
-            result = ''
+            table = Morse.Encoder.TABLE
+            result = []
             for word in code.split('  '):
                 for sequence in word.split(' '):
                     if sequence in table:
-                        result += table[sequence]
+                        result.append(table[sequence])
                     # silently ignore unknown sequences
-                result += ' '
+                result.append(' ')
 
-            return result.lower()
+            return ''.join(result).lower()
 
         def to_bytes(code: str) -> bytes:
-            result = b''
-            currbyte = 0
+            symbols = Morse.Encoder.SYMBOLS
+            value = 0
             shift = 0
             for char in code:
-                if char == '.':
-                    currbyte |= (0x01 << shift)
-                elif char == '-':
-                    currbyte |= (0x02 << shift)
-                elif char != ' ':
+                symbol = symbols.get(char)
+                if symbol is None:
                     # silently ignore invalid characters
                     continue
+                value |= symbol << shift
+                shift += 2
+            value |= 0x03 << shift
 
-                if shift == 6:
-                    shift = 0
-                    result += currbyte.to_bytes(1, 'big')
-                    currbyte = 0
-                else:
-                    shift += 2
-            currbyte |= (0x03 << shift)
-
-            return result + currbyte.to_bytes(1, 'big')
+            return value.to_bytes(shift // 8 + 1, 'little')
 
         def from_bytes(data: bytes) -> str:
-            result = ''
+            table = Morse.Encoder.BYTES
+            result = []
             for currbyte in data:
-                shift = 0
-                while shift <= 6:
-                    bits = (currbyte >> shift) & 0x03
-                    shift += 2
-                    if bits == 0x00:
-                        result += ' '
-                    elif bits == 0x01:
-                        result += '.'
-                    elif bits == 0x02:
-                        result += '-'
-                    elif bits == 0x03:
-                        return result
-
-            return result
+                (text, end) = table[currbyte]
+                result.append(text)
+                if end:
+                    break
+
+            return ''.join(result)
+
+        def pack(message: str, size: int = 120) -> bytes:
+            """Encodes a message straight into a zero padded buffer of 'size' bytes.
+
+               Each character is looked up once and shifted onto a single
+               integer, 4 symbols to a byte, which is converted to bytes at
+               the end. Characters which no longer fit (along with the end
+               marker) are discarded, unknown characters are skipped.
+            """
+            codes = Morse.Encoder.CODES
+            limit = size * 8 - 2
+            value = 0
+            shift = 0
+            for char in message:
+                code = codes.get(char)
+                if code is None:
+                    continue
+                if shift + code[1] > limit:
+                    break
+                value |= code[0] << shift
+                shift += code[1]
+            value |= 0x03 << shift
+
+            return value.to_bytes(size, 'little')
+
+        def pages(message: str, slot: int = None) -> list:
+            """The MorsePages holding a message, only those up to the end marker.
+
+            Parameters
+            ----------
+            message : str
+                The text to encode, truncated to 120 bytes of code.
+            slot : int
+                Writes the memory slot 1 - 3 (pages 2 - 7) rather than the
+                active pages (0 and 1).
+
+            Returns
+            -------
+            list
+                One or two MorsePage packets.
+
+            """
+
+            first = 0
+            if slot is not None:
+                validate_range(slot, 1, 3)
+                first = slot * 2
+
+            data = Morse.Encoder.pack(message, Morse.Encoder.SIZE)
+            size = Morse.Encoder.PAGE_SIZE
+            # The second page is only read when the code (ending with a non zero byte) runs past the first
+            count = 1 if len(data.rstrip(b'\0')) <= size else 2
+            pages = []
+            for index in range(count):
+                page = Packet.Profile.MorsePage(first + index)
+                page.setData(data[index * size:(index + 1) * size])
+                pages.append(page)
+            return pages
 
     # p3 is always 0x05
     def getCaps(self) -> Caps:
@@ -479,3 +535,32 @@ class Morse(Static):
 
     def isReapeat(self) -> bool:
         return self.settings.getParam(4) == 0xFF
+
+
+def _morse_tables() -> None:
+    Encoder = Morse.Encoder
+    Encoder.SYMBOLS = {' ': 0x00, '.': 0x01, '-': 0x02}
+
+    for (char, sequence) in Encoder.ALPHABET.items():
+        value = 0
+        for (position, symbol) in enumerate(sequence + ' '):
+            value |= Encoder.SYMBOLS[symbol] << (position * 2)
+        Encoder.CODES[char] = Encoder.CODES[char.lower()] = (value, (len(sequence) + 1) * 2)
+        Encoder.TABLE[sequence] = char
+
+    names = ' .-'
+    table = []
+    for currbyte in range(256):
+        text = ''
+        end = False
+        for shift in range(0, 8, 2):
+            bits = (currbyte >> shift) & 0x03
+            if bits == 0x03:
+                end = True
+                break
+            text += names[bits]
+        table.append((text, end))
+    Encoder.BYTES = tuple(table)
+
+
+_morse_tables()
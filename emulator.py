@@ -0,0 +1,264 @@
+import random
+import time
+from array import array
+from struct import pack
+from collections import deque
+import usb.core
+from driver import Driver
+from packet.types import Resolution
+from state import EFFECT_IDS, IDX_ZONE_LOGO, IDX_ZONE_FAN, IDX_ACTIVE_ZONES, IDX_MORSE_FIRST, \
+    MORSE_LENGTH, IDX_FREQUENCY, IDX_RESOLUTION, TOTAL_PACKETS, ZONE_ID_LOGO, ZONE_ID_FAN, cache_index
+
+
+VENDOR_ID = 0x2516
+PRODUCT_ID = 0x0051
+
+MODE_FIRMWARE = 0x10
+MODE_CONTROL = 0x40
+MODE_PROFILE = 0x50
+MODE_WRITE = 0x01
+MODE_READ = 0x02
+
+# Factory defaults, taken from captures in packet/protocol.txt
+DEFAULT_EFFECTS = {
+    0x00: b'\x00\xFF\x00\xFF\xFF\xFF\xAB\xCD\xEF\x00\x00\x00',
+    0x07: b'\x07\x64\x00\x05\xFF\xFF\xFF\xFF\xFF\x00\x00\x00',
+    0x0A: b'\x0A\x6E\x00\x4A\xFF\xFF\xFF\xFF\xFF\x00\x00\x00',
+    0x09: b'\x09\x6E\x00\xC3\xFF\xFF\xFF\xFF\xFF\x00\x00\x00',
+    0x08: b'\x08\x6E\x00\xFF\xFF\xFF\xFF\xFF\xFF\x00\x00\x00',
+    0x0B: b'\x0B\xFF\x00\x05\xFF\xFF\xFF\xFF\xFF\x00\x00\x00',
+    0x02: b'\x02\x80\x00\xFF\xFF\x7F\x00\x00\x00\x00\x00\x00',
+    0x01: b'\x01\x31\x20\x03\xFF\xFF\xFF\xFF\xFF\x00\x00\x00',
+    ZONE_ID_LOGO: b'\x05\xFF\x00\x01\xFF\xFF\x00\xFF\x00\x00\x00\x00',
+    ZONE_ID_FAN: b'\x06\xFF\x00\x01\xFF\xFF\xAB\xCD\xEF\x00\x00\x00',
+}
+
+EFFECT_NAMES = ('full_on', 'breath', 'cycle', 'audio', 'cpu_temp', 'fanled_1', 'fanled_2',
+                'rainbow', 'bounce', 'chase', 'swirl', 'morse', 'off')
+
+
+class Emulator:
+    """Stands in for the USB device.
+
+       Keeps the same 21 packet state as the kernel driver and answers
+       packets the way the firmware does. Invalid packets are answered with
+       a 0xFF 0xAA error packet. An instance acts as both the reader and the
+       writer endpoint.
+
+    Parameters
+    ----------
+    latency : float
+        Seconds each transfer takes to answer.
+    jitter : float
+        Maximum number of seconds, in either direction, added to the latency.
+    seed : int
+        Seeds the jitter, for reproducible runs.
+
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.responses = deque()
+        self.transfers = 0
+        self.errors = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.cache = bytearray(64 * TOTAL_PACKETS)
+        self.breath = {}
+
+        for i, id in enumerate(EFFECT_IDS):
+            self._store(i, self._packet(0x2C, 0x01, 0x00, DEFAULT_EFFECTS[id], b'\xFF'))
+        self._store(IDX_ZONE_LOGO, self._packet(0x2C, 0x01, 0x00, DEFAULT_EFFECTS[ZONE_ID_LOGO], b'\xFF'))
+        self._store(IDX_ZONE_FAN, self._packet(0x2C, 0x01, 0x00, DEFAULT_EFFECTS[ZONE_ID_FAN], b'\xFF'))
+
+        self._store(IDX_ACTIVE_ZONES, self._packet(0xA0, 0x01, 0x00,
+                                                   b'\x00\x03\x00\x00\x05\x06' + b'\x0A' * 15))
+        for i in range(MORSE_LENGTH):
+            self._store(IDX_MORSE_FIRST + i, self._packet(0x73, i, 0x00, b'\x03'))
+
+        self._store(IDX_FREQUENCY, self._packet(0x94, 0x00, 0x00, pack('<B9H', 0x03, *(
+            45, 500, 2000, 100, 1000, 1500, 200, 300, 400))))
+
+        res = Resolution.encode(Resolution.from_hertz(100).value)
+        self._store(IDX_RESOLUTION, self._packet(0x71, 0x00, 0x00,
+                                                 b'\x01\x00\xFF\x4A\x02' + res + b'\x03' + res + b'\x04' + res))
+
+    def _packet(self, operation: int, index: int, flags: int, payload: bytes = b'',
+                padChar: bytes = b'\x00', mode: int = MODE_PROFILE | MODE_READ) -> bytes:
+        data = bytes((mode, operation, index, flags)) + payload
+        return data + padChar * (64 - len(data))
+
+    def _store(self, index: int, data: bytes) -> None:
+        offset = index * 64
+        self.cache[offset:offset + 64] = data
+        self.cache[offset] = MODE_PROFILE | MODE_READ
+
+    def _load(self, index: int) -> bytes:
+        return bytes(self.cache[index * 64:(index + 1) * 64])
+
+    def _error(self, request: bytes) -> bytes:
+        self.errors += 1
+        return bytes((0xFF, 0xAA, 0x00, 0x00)) + bytes(request[:4]).ljust(60, b'\x00')
+
+    def write(self, data, timeout: int = None) -> int:
+        data = bytes(data)
+        self.transfers += 1
+
+        if len(data) != 64:
+            self.responses.append(self._error(data))
+        else:
+            self.responses.append(self.handle(data))
+
+        return len(data)
+
+    def read(self, size_or_buffer, timeout: int = None):
+        if not self.responses:
+            raise usb.core.USBTimeoutError('Operation timed out')
+
+        delay = self.latency
+        if self.jitter:
+            delay += self.random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        response = self.responses.popleft()
+        if isinstance(size_or_buffer, array):
+            size_or_buffer[:len(response)] = array('B', response)
+            return len(response)
+
+        return array('B', response[:size_or_buffer])
+
+    def handle(self, request: bytes) -> bytes:
+        """Computes the response to a single 64 byte packet."""
+        group = request[0] & 0xF0
+        mode = request[0] & 0x0F
+
+        if group == MODE_PROFILE:
+            return self._profile(request, mode)
+        if group == MODE_CONTROL:
+            return self._control(request, mode)
+        if group == MODE_FIRMWARE and mode == MODE_READ:
+            return self._firmware(request)
+
+        return self._error(request)
+
+    def _validate(self, request: bytes) -> bool:
+        operation = request[1]
+
+        if operation == 0xA0:
+            return request[5] == 0x03 and request[8] == ZONE_ID_LOGO and request[9] == ZONE_ID_FAN
+        if operation == 0x94:
+            return request[4] == 0x03
+        if operation == 0x71:
+            return request[4] == 0x01 and request[8] == 0x02 and request[12] == 0x03 and request[16] == 0x04
+
+        return True
+
+    def _profile(self, request: bytes, mode: int) -> bytes:
+        operation = request[1]
+
+        if operation == 0x70:
+            if request[2] > 4 or request[3] > 1:
+                return self._error(request)
+            key = (request[2], request[3])
+            if mode == MODE_WRITE:
+                self.breath[key] = request[4:]
+                return request
+            return request[:4] + self.breath.get(key, bytes(60))
+
+        if operation in (0x28, 0x29):
+            if mode == MODE_WRITE:
+                return request
+            return self._packet(operation, 0x00, 0x00, b'\xE0')
+
+        if operation == 0x96 or mode == 0x00:
+            return request[:4] + bytes(60)
+
+        index = cache_index(request)
+        if index is None:
+            return self._error(request)
+
+        if mode == MODE_READ:
+            if index == IDX_RESOLUTION:
+                # The resolution packet is write only
+                return self._error(request)
+            return self._load(index)
+
+        if mode == MODE_WRITE:
+            if not self._validate(request):
+                return self._error(request)
+            self._store(index, request)
+            return request
+
+        return self._error(request)
+
+    def _control(self, request: bytes, mode: int) -> bytes:
+        operation = request[1]
+
+        if mode == 0x00 and operation == 0x20:
+            return request[:4] + pack('<HBBII', 0x0001, 0x02, len(EFFECT_NAMES), 0x00000100, 0x00000001).ljust(60, b'\x00')
+        if mode == 0x00 and operation == 0x21:
+            if request[2] >= len(EFFECT_NAMES):
+                return self._error(request)
+            return request[:4] + pack('<I56s', 0x00000329, EFFECT_NAMES[request[2]].encode('ascii'))
+        if mode == MODE_READ and operation == 0x00:
+            return request[:4] + bytes((0x01, 0x00, 0x00, 0x01, 0x01)).ljust(60, b'\x00')
+        if mode == MODE_WRITE and operation in (0x00, 0x03, 0x80):
+            return request[:4] + bytes(60)
+
+        return self._error(request)
+
+    def _firmware(self, request: bytes) -> bytes:
+        operation = request[1]
+
+        if operation == 0x00:
+            payload = pack('<IIHHIIIIIIH10sIII', 0x00000004, 0x00000000, 0x2516, 0x0052, 0x04087000,
+                           0xFFFFFFFF, 0x00000001, 0xFFFFFFFF, 0x000000E0, 0x00E70200, 0x0200,
+                           b'LM0303', 0xFFFFFFFF, 0x00000000, 0x00000000)
+        elif operation == 0x01:
+            payload = pack('<HH', 0x0004, 0x0002)
+        elif operation == 0x20:
+            payload = pack('<I26s', 0x0000001A, u'V1.01.00'.encode('utf-16le'))
+        elif operation == 0x22:
+            payload = pack('<6H3I2H8I', 0x0004, 0x0080, 0x0100, 0x0001, 0x00E0, 0x0000,
+                           0xEFFFFFFF, 0x00000001, 0x00000000, 0x2516, 0x0051,
+                           *((0xFFFFFFFF,) * 7), 0x001C5AA5)
+        else:
+            return self._error(request)
+
+        return request[:4] + payload.ljust(60, b'\x00')
+
+
+class EmulatedDriver(Driver):
+    """A Driver talking to an Emulator instead of the USB bus.
+
+    Parameters
+    ----------
+    emulator : Emulator
+        The emulated device, a fresh one is created if omitted.
+    cache : bool
+        Whether to keep a DeviceState, see Driver.
+    strict : bool
+        Strict or fast packet validation, see Driver.
+    lazy : bool
+        Lazy field decoding in fast mode, see Driver.
+
+    """
+
+    def __init__(self, emulator: Emulator = None, cache: bool = True, strict: bool = None,
+                 lazy: bool = False):
+        super().__init__(VENDOR_ID, PRODUCT_ID, cache=cache, strict=strict, lazy=lazy)
+        self.emulator = emulator if emulator is not None else Emulator()
+
+    def _claim(self):
+        self.device = self.emulator
+        self.reader = self.emulator
+        self.writer = self.emulator
+
+    def detach(self):
+        self.reader = None
+        self.writer = None
+        self.device = None
@@ -0,0 +1,233 @@
+import math
+from time import perf_counter
+from packet import Packet
+from driver import Driver
+
+
+STAGE_ENCODE = 'encode'
+STAGE_WRITE = 'write'
+STAGE_READ = 'read'
+STAGE_COLLECT = 'collect'
+STAGE_DECODE = 'decode'
+STAGES = (STAGE_ENCODE, STAGE_WRITE, STAGE_READ, STAGE_COLLECT, STAGE_DECODE)
+
+
+class Histogram:
+    """Log scaled histogram of durations, in seconds.
+
+       Buckets grow by 5%, so percentiles are accurate to within 5% while
+       the memory used stays bounded whatever the number of samples.
+    """
+
+    GROWTH = 1.05
+    SMALLEST = 1e-7
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        if value > self.SMALLEST:
+            bucket = int(math.log(value / self.SMALLEST, self.GROWTH)) + 1
+        else:
+            bucket = 0
+
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> float:
+        """The upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return 0.0
+
+        rank = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.SMALLEST * self.GROWTH ** bucket, self.max)
+
+        return self.max
+
+    def stats(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class Counters:
+    """Timings and traffic of one packet class or operation."""
+
+    def __init__(self):
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.packets = 0
+        self.errors = 0
+        self.written = 0
+        self.received = 0
+
+    def stats(self) -> dict:
+        return {
+            'packets': self.packets,
+            'errors': self.errors,
+            'error_rate': self.errors / self.packets if self.packets else 0.0,
+            'bytes_written': self.written,
+            'bytes_received': self.received,
+            'stages': {stage: histogram.stats() for stage, histogram in self.stages.items()},
+        }
+
+
+class Instruments:
+    """Times each stage of the transport and calls the installed hooks.
+
+       A transfer goes through five stages per packet: encode, write, read,
+       collect (copying the response and updating the state cache) and
+       decode, each the same code as without instruments (see
+       Driver.instrument()). For every stage a span is reported with the
+       request, the operation byte, the start and end of the stage
+       (perf_counter) and the bytes involved:
+
+           hook(stage, request, operation, start, end, data)
+
+       Raw frames, sent through Driver.transfer(), have no packet and are
+       reported with a None request and no encode or decode stage.
+
+       The built in hook collects histograms and counters, per packet class
+       and per operation byte, readable through stats().
+
+       See Driver.instrument(), a driver without instruments installed runs
+       the plain transport code.
+    """
+
+    def __init__(self, collect: bool = True):
+        self.hooks = []
+        self.classes = {}
+        self.operations = {}
+        self.total = Counters()
+        if collect:
+            self.hooks.append(self.collect)
+
+    def addHook(self, hook) -> None:
+        self.hooks.append(hook)
+
+    def removeHook(self, hook) -> None:
+        self.hooks.remove(hook)
+
+    def span(self, stage: str, request, operation: int, start: float, end: float, data) -> None:
+        for hook in self.hooks:
+            hook(stage, request, operation, start, end, data)
+
+    def collect(self, stage: str, request, operation: int, start: float, end: float, data) -> None:
+        name = type(request).__name__ if request is not None else 'Frame'
+        kind = self.classes.get(name)
+        if kind is None:
+            kind = self.classes[name] = Counters()
+        op = self.operations.get(operation)
+        if op is None:
+            op = self.operations[operation] = Counters()
+
+        elapsed = end - start
+        for counters in (kind, op, self.total):
+            counters.stages[stage].add(elapsed)
+            if stage == STAGE_WRITE:
+                counters.packets += 1
+                counters.written += len(data)
+            elif stage == STAGE_READ:
+                counters.received += len(data)
+                if data[0] == 0xFF and data[1] == 0xAA:
+                    counters.errors += 1
+
+    def reset(self) -> None:
+        self.classes = {}
+        self.operations = {}
+        self.total = Counters()
+
+    def stats(self) -> dict:
+        """The collected statistics, durations are in seconds.
+
+        Returns
+        -------
+        dict
+            'total', 'classes' keyed by packet class name and 'operations'
+            keyed by operation byte, each holding the packet, error and byte
+            counts and the p50/p95/p99/max duration of each stage.
+
+        """
+
+        return {
+            'total': self.total.stats(),
+            'classes': {name: counters.stats() for name, counters in self.classes.items()},
+            'operations': {op: counters.stats() for op, counters in self.operations.items()},
+        }
+
+
+def _operation(frame) -> int:
+    return frame.operation if isinstance(frame, Packet.Raw) else frame[1]
+
+
+def _request(frame):
+    return frame if isinstance(frame, Packet.Raw) else None
+
+
+def encode_frame(driver, frame, target) -> None:
+    """Driver._encodeFrame(), timed. Raw frames are only copied, they have no encode stage."""
+    start = perf_counter()
+    Driver._encodeFrame(driver, frame, target)
+    end = perf_counter()
+    if isinstance(frame, Packet.Raw):
+        driver.instruments.span(STAGE_ENCODE, frame, frame.operation, start, end, target)
+
+
+def write_frame(driver, frame, data, timeout) -> None:
+    """Driver._writeFrame(), timed."""
+    start = perf_counter()
+    try:
+        Driver._writeFrame(driver, frame, data, timeout)
+    finally:
+        driver.instruments.span(STAGE_WRITE, _request(frame), _operation(frame), start, perf_counter(), data)
+
+
+def read_frame(driver, frame, buffer, timeout) -> None:
+    """Driver._readFrame(), timed."""
+    start = perf_counter()
+    try:
+        Driver._readFrame(driver, frame, buffer, timeout)
+    finally:
+        driver.instruments.span(STAGE_READ, _request(frame), _operation(frame), start, perf_counter(), buffer)
+
+
+def collect_frame(driver, frame, buffer) -> bytes:
+    """Driver._collectFrame(), timed."""
+    start = perf_counter()
+    response = Driver._collectFrame(driver, frame, buffer)
+    end = perf_counter()
+    driver.instruments.span(STAGE_COLLECT, _request(frame), _operation(frame), start, end, response)
+    return response
+
+
+def decode_frame(driver, request, response: bytes):
+    """Driver._decodeFrame(), timed."""
+    start = perf_counter()
+    decoded = Driver._decodeFrame(driver, request, response)
+    end = perf_counter()
+    driver.instruments.span(STAGE_DECODE, request, request.operation, start, end, response)
+    return decoded
+
+
+# The Driver methods replaced by Driver.instrument()
+HOOKS = {
+    '_encodeFrame': encode_frame,
+    '_writeFrame': write_frame,
+    '_readFrame': read_frame,
+    '_collectFrame': collect_frame,
+    '_decodeFrame': decode_frame,
+}
@@ -4,6 +4,7 @@ from packet.types import RGB
 from zone import Fan
 from debug import validate_tuple
 from effects import Effect
+from state import ZONE_ID_FAN
 
 
 def toHex(value): return "".join("0x{:02X} ".format(c) for c in value)
@@ -18,7 +19,7 @@ usb = Driver(VENDOR_ID, PRODUCT_ID)
 # To change a profile, the full sequqnce of packets must be sent
 
 # Get the active fan profile
-profile = Packet.Profile.EffectSettings(0x05, Packet.Profile.MODE_READ)
+profile = Packet.Profile.EffectSettings(ZONE_ID_FAN, Packet.Profile.MODE_READ)
 response = usb.post(profile)
 # profile.dump()
 print(response)
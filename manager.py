@@ -0,0 +1,132 @@
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor, wait
+import usb.core
+from driver import Driver
+
+
+VENDOR_ID = 0x2516
+PRODUCT_ID = 0x0051
+
+
+class DeviceManager:
+    """Drives every attached cooler at once.
+
+       Each device gets its own claimed Driver and its own I/O thread, so
+       work fanned out to all devices takes about as long as the slowest
+       device rather than the sum of them.
+
+    Parameters
+    ----------
+    vendorId : int
+        The USB vendor id to enumerate.
+    productId : int
+        The USB product id to enumerate.
+    interface : int
+        The interface to claim on each device.
+
+    """
+
+    def __init__(self, vendorId=VENDOR_ID, productId=PRODUCT_ID, interface=1):
+        self.vendorId = vendorId
+        self.productId = productId
+        self.interfaceNum = interface
+        self.drivers = []
+        self.workers = []
+
+    def __len__(self):
+        return len(self.drivers)
+
+    def __enter__(self) -> 'DeviceManager':
+        self.attach()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.detach()
+
+    def add(self, driver: Driver) -> Driver:
+        """Adds an (unattached) driver, with a worker of its own."""
+        self.drivers.append(driver)
+        self.workers.append(ThreadPoolExecutor(max_workers=1,
+                                               thread_name_prefix='plasma-io-%d' % len(self.workers)))
+        return driver
+
+    def attach(self) -> int:
+        """Enumerates and attaches all matching devices, returns the count.
+
+           When a device fails to attach, those which did are detached again
+           before the first error is raised, while the failing one releases
+           its own claim (see Driver.attach()). No interface is left claimed.
+        """
+        if not self.drivers:
+            for device in usb.core.find(find_all=True, idVendor=self.vendorId, idProduct=self.productId):
+                self.add(Driver(self.vendorId, self.productId, self.interfaceNum, usbDevice=device))
+
+        futures = self.submit(lambda driver: driver.attach())
+        wait(futures)
+        errors = [future.exception() for future in futures]
+        failed = [error for error in errors if error is not None]
+        if failed:
+            self._detach([driver for (driver, error) in zip(self.drivers, errors) if error is None])
+            raise failed[0]
+
+        return len(self.drivers)
+
+    def detach(self) -> None:
+        self._detach(self.drivers)
+
+    def _detach(self, attached: list) -> None:
+        try:
+            self.run(lambda driver: driver.detach() if driver in attached else None)
+        finally:
+            for worker in self.workers:
+                worker.shutdown(wait=True)
+            self.drivers = []
+            self.workers = []
+
+    def submit(self, fn, *args) -> list:
+        """Queues fn(driver, *args) on every device, returns the futures."""
+        return [worker.submit(fn, driver, *args) for driver, worker in zip(self.drivers, self.workers)]
+
+    def run(self, fn, *args) -> list:
+        """Runs fn(driver, *args) on every device in parallel.
+
+           Waits for all devices to finish before raising the first error.
+
+        Returns
+        -------
+        list
+            The result for each device, in the order of self.drivers.
+
+        """
+
+        futures = self.submit(fn, *args)
+        wait(futures)
+        return [future.result() for future in futures]
+
+    def broadcast(self, packets, timeout=100) -> list:
+        """Sends the same packet batch to every device.
+
+           Each device is given its own copy of the packets, since they are
+           updated from the responses.
+
+        Returns
+        -------
+        list
+            The responses of each device.
+
+        """
+
+        packets = list(packets)
+        return self.run(lambda driver: driver.post_many(deepcopy(packets), timeout))
+
+    def commit(self, *items, store: bool = False) -> list:
+        """Commits zones, effects or packets to every device in a transaction.
+
+           See Transaction, each device is given its own copy of the items.
+        """
+        def apply(driver: Driver) -> list:
+            transaction = driver.transaction(store)
+            transaction.add(*deepcopy(items))
+            return transaction.commit()
+
+        return self.run(apply)
@@ -1,21 +1,32 @@
-import os
 import sys
-import argparse
+from importlib import import_module
 
-path = os.path.dirname(__file__)
-dir = os.path.basename(path)
+# The members of the Packet namespace, by the module defining them
+MEMBERS = {
+    'Blob': 'blob',
+    'Control': 'control',
+    'Firmware': 'firmware',
+    'Layout': 'layout',
+    'Profile': 'profile',
+    'Raw': 'raw',
+}
 
-setattr(sys.modules[__name__], dir.capitalize(), argparse.Namespace())
-tmp = getattr(sys.modules[__name__], dir.capitalize())
 
-for module in os.listdir(path):
-    if module[:1] != '_' and module[-3:] == '.py':
-        name = module[:-3]
-        field = name.capitalize()
+def __getattr__(name: str):
+    """Imports the module defining a member on first access, see MEMBERS."""
+    module = MEMBERS.get(name)
+    if module is None:
+        raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
 
-        __import__(dir + '.' + name, locals(), globals())
-        _module = getattr(sys.modules[__name__], name)
-        if hasattr(_module, field):
-            setattr(tmp, field, getattr(_module, field))
+    value = getattr(import_module('.' + module, __name__), name)
+    # Cached as a global, later lookups no longer reach __getattr__
+    globals()[name] = value
+    return value
 
-del path, dir, module, tmp
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(MEMBERS))
+
+
+# The package itself is the namespace: Packet.Profile only imports packet.profile
+Packet = sys.modules[__name__]
@@ -1,40 +1,76 @@
+from struct import Struct
 from .types import Number, BYTE, WORD, DWORD, BYTESTR
 from debug import validate_type, validate_length, validate_range, validate_lower
 
 
+UINT8 = Struct('<B')
+UINT16 = Struct('<H')
+UINT32 = Struct('<I')
+NUMBERS = {1: UINT8, 2: UINT16, 4: UINT32}
+
+# Fill patterns for the unwritten part of an encoded packet, by pad character
+PADDING = {}
+
+
+def fill(padChar: bytes) -> bytes:
+    """64 bytes of padChar (zeros when None)."""
+    padding = PADDING.get(padChar)
+    if padding is None:
+        padding = PADDING[padChar] = (padChar or b'\x00') * 64
+    return padding
+
+
 class Blob:
     """Helper class for reading out raw values.
 
+       The data lives in a single 64 byte buffer, read and written in place
+       through a memoryview. Numbers are packed and unpacked directly, so
+       only the bytes fields returned by readBytes() are copied.
+
     Parameters
     ----------
     byteStr : bytes
         64 bytes of raw packet data.
+    target : bytearray|memoryview
+        A writable 64 byte buffer to encode into, such as a slice of the
+        USB transfer buffer. A new buffer is allocated if not given.
 
     """
 
-    def __init__(self, byteStr=None, padChar=None, debug=True):
+    def __init__(self, byteStr=None, padChar=None, debug=True, target=None):
         if byteStr is not None:
-            validate_type(byteStr, bytes)
+            validate_type(byteStr, [bytes, bytearray, memoryview])
             validate_length(byteStr, 64)
             # assert isinstance(byteStr, bytes), 'Expected 64 bytes, got %s.' % type(byteStr)
             # assert len(byteStr) is 64, 'Expected 64 bytes, got %s.' % len(byteStr)
 
-            self.data = byteStr
+            self.data = memoryview(byteStr)
             self.size = 64
         else:
-            self.data = b''
+            if target is None:
+                target = bytearray(64)
+            else:
+                validate_length(target, 64)
+
+            self.data = memoryview(target)
+            self.data[:] = fill(padChar)
             self.size = 0
 
         self.debug = debug
         self.offset = 0
         self.padChar = padChar
 
-    def __del__(self):
+    def close(self) -> None:
+        """Checks, in debug mode, that all 64 bytes were read or written."""
         if self.debug:
             assert self.offset == 64, 'Not all bytes read/written, %d remain.' % (64 - self.offset)
 
     def __bytes__(self):
-        return self.data + ((64 - self.size) * self.padChar)
+        return self.data.tobytes()
+
+    def view(self) -> memoryview:
+        """The underlying buffer, padded to 64 bytes."""
+        return self.data
 
     def length(self) -> int:
         return self.size
@@ -83,11 +119,34 @@ class Blob:
         validate_range(numBytes, 1, 63, msg='numBytes must be within the range 0-63, got $0.')
         validate_lower(end, 65, msg='unable to read $0 bytes, only %d remain.' % (64 - self.offset))
 
-        str = self.data[self.offset:end]
+        str = self.data[self.offset:end].tobytes()
         self.offset = end
 
         return str
 
+    def readStruct(self, format: Struct) -> tuple:
+        """Unpacks a precompiled struct at the current offset.
+
+        Returns
+        -------
+        tuple
+            The unpacked values.
+
+        Raises
+        -------
+        AssertationException
+            If trying to read outside the range of available data.
+
+        """
+
+        end = self.offset + format.size
+        validate_lower(end, 65, msg='unable to read $0 bytes, only %d remain.' % (64 - self.offset))
+
+        values = format.unpack_from(self.data, self.offset)
+        self.offset = end
+
+        return values
+
     def readByte(self) -> BYTE:
         """Reads a single character (1 byte).
 
@@ -103,7 +162,7 @@ class Blob:
 
         """
 
-        return BYTE(self.readBytes(1))
+        return BYTE(self.readStruct(UINT8)[0])
 
     def readWord(self) -> WORD:
         """Reads a single word (2 bytes).
@@ -120,7 +179,7 @@ class Blob:
 
         """
 
-        return WORD(self.readBytes(2))
+        return WORD(self.readStruct(UINT16)[0])
 
     def readDword(self) -> DWORD:
         """Reads a single dword (4 bytes).
@@ -137,7 +196,7 @@ class Blob:
 
         """
 
-        return DWORD(self.readBytes(4))
+        return DWORD(self.readStruct(UINT32)[0])
 
     def writeBytes(self, byteStr) -> int:
         """Appends the bytes to the buffer.
@@ -154,16 +213,45 @@ class Blob:
 
         """
 
-        if not isinstance(byteStr, bytes):
-            validate_type(byteStr, [Number, BYTESTR])
-            byteStr = bytes(byteStr)
+        if isinstance(byteStr, Number):
+            format = NUMBERS[byteStr.size]
+            c = format.size
+        else:
+            if not isinstance(byteStr, bytes):
+                validate_type(byteStr, [BYTESTR])
+                byteStr = bytes(byteStr)
+            format = None
+            c = len(byteStr)
+
+        assert self.size + \
+            c <= 64, 'Not enough remaining space (%d bytes) to write (%d bytes)' % (
+                64 - self.size, c)
+
+        if format is not None:
+            format.pack_into(self.data, self.size, byteStr)
+        else:
+            self.data[self.size:self.size + c] = byteStr
+        self.size += c
+        self.offset += c
+
+        return c
+
+    def writeStruct(self, format: Struct, values) -> int:
+        """Packs the values with a precompiled struct, appending them.
+
+        Raises
+        -------
+        AssertationError
+            If the packed data does not fit.
+
+        """
 
-        c = len(byteStr)
+        c = format.size
         assert self.size + \
             c <= 64, 'Not enough remaining space (%d bytes) to write (%d bytes)' % (
                 64 - self.size, c)
 
-        self.data += byteStr
+        format.pack_into(self.data, self.size, *values)
         self.size += c
         self.offset += c
 
@@ -1,8 +1,8 @@
-from argparse import Namespace
+from types import SimpleNamespace
 from .raw import Raw
-from .blob import Blob
-from .types import WORD
-from debug import validate
+from .registry import register
+from .layout import Layout, Field, Text
+from .types import BYTE, WORD, DWORD
 
 
 MODE_FIRMWARE = 0x40
@@ -11,82 +11,91 @@ MODE_READ = 0x42
 
 
 class Base(Raw):
+    __slots__ = ()
+
     def displayName(self) -> str:
         return 'Packet.Control.%s' % self.__class__.__name__
 
 
 # 0x42 0x00 0x00 0x00 - Write - zeros memory?
 class Anon_00(Base):
+    __slots__ = ()
+
     # 42 00 00 00 01 00 00 01 01 00 00 00 00 00 00 00
     def __init__(self):
         super().__init__(MODE_READ, 0x00, 0x00, 0x00)
 
-        self.unknown_02 = WORD(b'\x01\x00')
-        self.unknown_03 = WORD(b'\x00\x01')
-        self.unknown_04 = WORD(b'\x01\x00')
-        self.unknown_05 = WORD(b'\x00\x00')
-        self.unknown_06 = WORD(b'\x00\x00')
-        self.unknown_07 = WORD(b'\x00\x00')
-
-    def encode(self, blob: Blob) -> None:
-        blob.writeBytes(self.unknown_02)
-        blob.writeBytes(self.unknown_03)
-        blob.writeBytes(self.unknown_04)
-        blob.writeBytes(self.unknown_05)
-        blob.writeBytes(self.unknown_06)
-        blob.writeBytes(self.unknown_07)
-
-    def decode(self, blob: Blob) -> None:
-        validate(blob.readWord(), self.unknown_02)
-        validate(blob.readWord(), self.unknown_03)
-        validate(blob.readWord(), self.unknown_04)
-        validate(blob.readWord(), self.unknown_05)
-        validate(blob.readWord(), self.unknown_06)
-        validate(blob.readWord(), self.unknown_07)
+    layout = Layout(
+        Field('unknown_02', WORD, expect=0x0001, default=WORD(b'\x01\x00')),
+        Field('unknown_03', WORD, expect=0x0100, default=WORD(b'\x00\x01')),
+        Field('unknown_04', WORD, expect=0x0001, default=WORD(b'\x01\x00')),
+        Field('unknown_05', WORD, expect=0x0000, default=WORD(b'\x00\x00')),
+        Field('unknown_06', WORD, expect=0x0000, default=WORD(b'\x00\x00')),
+        Field('unknown_07', WORD, expect=0x0000, default=WORD(b'\x00\x00'))
+    )
 
 
 # 0x41 0x00 0x00 0x00 - Read - once during app start (with data)
 class Reset(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_WRITE, 0x00, 0x00, 0x00)
 
 
 # 0x41 0x03 0x00 0x00 - Used during app start to read all settings, and "apply" to write changes
 class Stored(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_WRITE, 0x03, 0x00, 0x00)
 
 
 # 0x40 0x20 0x00 0x00 - Used to fetch details about the effects
 class EffectDetails(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_FIRMWARE, 0x20, 0x00, 0x00)
 
-    def decode(self, blob: Blob) -> None:
-        self.unknown_02 = blob.readWord()   # 0x0001
-        self.unknown_03 = blob.readByte()   # 0x02
-        self.count = blob.readByte()        # 0x000D (Num of effects)
-        self.unknown_02 = blob.readDword()  # 0x00000100
-        self.unknown_02 = blob.readDword()  # 0x00000001
+    layout = Layout(
+        Field('unknown_02', WORD),   # 0x0001
+        Field('unknown_03', BYTE),   # 0x02
+        Field('count', BYTE),        # 0x000D (Num of effects)
+        Field('unknown_04', DWORD),  # 0x00000100
+        Field('unknown_05', DWORD)   # 0x00000001
+    )
 
 
 # 0x40 0x21 <index> 0x00 - Used to return effect names (also a few flags)
 class EffectName(Base):
+    __slots__ = ()
+
     def __init__(self, index: int):
         super().__init__(MODE_FIRMWARE, 0x21, index, 0x00)
 
-    def decode(self, blob: Blob) -> None:
-        self.unknown_02 = blob.readDword()  # 0x00000329 - bit set
-        self.name = blob.readBytes(56).decode('ascii')  # null terminated string
+    layout = Layout(
+        Field('unknown_02', DWORD),  # 0x00000329 - bit set
+        Field('name', Text(56))      # null terminated string
+    )
 
 
 # 0x41 0x80 0x00 0x00 - Used any time the active effect is changed
 class Active(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_WRITE, 0x80, 0x00, 0x00)
 
 
-Control = Namespace(
+register(Anon_00, MODE_READ, 0x00)
+register(Reset, MODE_WRITE, 0x00)
+register(Stored, MODE_WRITE, 0x03)
+register(EffectDetails, MODE_FIRMWARE, 0x20)
+register(EffectName, MODE_FIRMWARE, 0x21)
+register(Active, MODE_WRITE, 0x80)
+
+Control = SimpleNamespace(
     Anon_00=Anon_00,
 
     EffectDetails=EffectDetails,
@@ -1,41 +1,50 @@
-from argparse import Namespace
+from types import SimpleNamespace
 from .raw import Raw
+from .registry import register
+from .layout import Layout, Field, Text
+from .types import WORD, DWORD
 from debug import validate
 
 MODE_READ = 0x12
 
 
 class Base(Raw):
+    __slots__ = ()
+
     def displayName(self):
         return 'Packet.Firmware.%s' % self.__class__.__name__
 
 
 # 0x12 0x00 0x00 0x00 - Firmware details
 class Query(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_READ, 0x00, 0x00, 0x00)
 
-    def decode(self, blob):
-        self.flags = validate(blob.readDword(), 0x00000004)
-        self.unknown_01 = validate(blob.readDword(), 0x00000000)
-        self.vendorId = validate(blob.readWord(), 0x2516)
-        self.productId = validate(blob.readWord(), 0x0052)
-        self.unknown_03 = validate(blob.readDword(), 0x04087000)
-        self.unknown_04 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_05 = validate(blob.readDword(), 0x00000001)
-        self.unknown_06 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_07 = validate(blob.readDword(), 0x000000E0)
-        self.unknown_08 = validate(blob.readDword(), 0x00E70200)
-        self.unknown_09 = validate(blob.readWord(), 0x0200)
-        value = blob.readBytes(10).decode('utf-8').rstrip('\0')
-        self.firmwareName = validate(value, 'LM0303')
-        self.unknown_12 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_13 = validate(blob.readDword(), 0x00000000)
-        self.unknown_14 = validate(blob.readDword(), 0x00000000)
+    layout = Layout(
+        Field('firmwareFlags', DWORD, expect=0x00000004),
+        Field('unknown_01', DWORD, expect=0x00000000),
+        Field('vendorId', WORD, expect=0x2516),
+        Field('productId', WORD, expect=0x0052),
+        Field('unknown_03', DWORD, expect=0x04087000),
+        Field('unknown_04', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_05', DWORD, expect=0x00000001),
+        Field('unknown_06', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_07', DWORD, expect=0x000000E0),
+        Field('unknown_08', DWORD, expect=0x00E70200),
+        Field('unknown_09', WORD, expect=0x0200),
+        Field('firmwareName', Text(10, 'utf-8'), expect='LM0303'),
+        Field('unknown_12', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_13', DWORD, expect=0x00000000),
+        Field('unknown_14', DWORD, expect=0x00000000)
+    )
 
 
 # 0x12 0x20 0x00 0x00 - The firmware version string
 class Version(Base):
+    __slots__ = ('size', 'versionStr')
+
     def __init__(self):
         super().__init__(MODE_READ, 0x20, 0x00, 0x00)
 
@@ -53,43 +62,54 @@ class Version(Base):
 
 # 0x12 0x01 0x00 0x00 - Contains some flags
 class Anon_01(Base):
+    __slots__ = ()
+
     # 0x12, 0x01, 0x00, 0x00, 0x04, 0x00, 0x02, 0x00,
     def __init__(self):
         super().__init__(MODE_READ, 0x01, 0x00, 0x00)
 
-    def decode(self, blob):
-        self.unknown_02 = validate(blob.readWord(), 0x0004)
-        self.unknown_03 = validate(blob.readWord(), 0x0002)
+    layout = Layout(
+        Field('unknown_02', WORD, expect=0x0004),
+        Field('unknown_03', WORD, expect=0x0002)
+    )
 
 
 # 0x12 0x22 0x00 0x00 - More firmware parameters
 class Anon_22(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_READ, 0x22, 0x00, 0x00)
 
-    def decode(self, blob):
-        self.unknown_02 = validate(blob.readWord(), 0x0004)
-        self.unknown_03 = validate(blob.readWord(), 0x0080)
-        self.unknown_04 = validate(blob.readWord(), 0x0100)
-        self.unknown_05 = validate(blob.readWord(), 0x0001)
-        self.unknown_06 = validate(blob.readWord(), 0x00E0)
-        self.unknown_07 = validate(blob.readWord(), 0x0000)
-        self.unknown_08 = validate(blob.readDword(), 0xEFFFFFFF)
-        self.unknown_09 = validate(blob.readDword(), 0x00000001)
-        self.unknown_10 = validate(blob.readDword(), 0x00000000)
-        self.vendorId = validate(blob.readWord(), 0x2516)
-        self.productId = validate(blob.readWord(), 0x0051)
-        self.unknown_11 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_12 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_13 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_14 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_15 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_16 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_17 = validate(blob.readDword(), 0xFFFFFFFF)
-        self.unknown_18 = validate(blob.readDword(), 0x001C5AA5)
-
-
-Firmware = Namespace(
+    layout = Layout(
+        Field('unknown_02', WORD, expect=0x0004),
+        Field('unknown_03', WORD, expect=0x0080),
+        Field('unknown_04', WORD, expect=0x0100),
+        Field('unknown_05', WORD, expect=0x0001),
+        Field('unknown_06', WORD, expect=0x00E0),
+        Field('unknown_07', WORD, expect=0x0000),
+        Field('unknown_08', DWORD, expect=0xEFFFFFFF),
+        Field('unknown_09', DWORD, expect=0x00000001),
+        Field('unknown_10', DWORD, expect=0x00000000),
+        Field('vendorId', WORD, expect=0x2516),
+        Field('productId', WORD, expect=0x0051),
+        Field('unknown_11', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_12', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_13', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_14', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_15', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_16', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_17', DWORD, expect=0xFFFFFFFF),
+        Field('unknown_18', DWORD, expect=0x001C5AA5)
+    )
+
+
+register(Query, MODE_READ, 0x00)
+register(Version, MODE_READ, 0x20)
+register(Anon_01, MODE_READ, 0x01)
+register(Anon_22, MODE_READ, 0x22)
+
+Firmware = SimpleNamespace(
     Query=Query,
     Version=Version,
     Anon_01=Anon_01,
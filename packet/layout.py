@@ -0,0 +1,225 @@
+from struct import Struct
+from .types import BYTE, WORD, DWORD, RGB, Resolution
+from .blob import fill
+from debug import validate
+
+
+class Unset:
+    """Marks the fields which are neither set nor decoded, survives copies."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return 'UNSET'
+
+    def __repr__(self):
+        return 'UNSET'
+
+
+UNSET = Unset()
+
+
+class Bytes:
+    """A fixed size run of raw bytes."""
+
+    def __init__(self, size: int):
+        self.format = '%ds' % size
+        self.size = size
+
+    def decode(self, value: bytes) -> bytes:
+        return value
+
+    def encode(self, value) -> bytes:
+        return bytes(value)
+
+
+class Text(Bytes):
+    """A fixed size, null padded string."""
+
+    def __init__(self, size: int, encoding: str = 'ascii'):
+        super().__init__(size)
+        self.encoding = encoding
+
+    def decode(self, value: bytes) -> str:
+        return value.decode(self.encoding).rstrip('\0')
+
+    def encode(self, value: str) -> bytes:
+        return value.encode(self.encoding)
+
+
+class Scalar:
+    """A number or a 3 byte value type, see packet.types."""
+
+    def __init__(self, format: str, type, encode):
+        self.format = format
+        self.size = Struct('<' + format).size
+        self.decode = type
+        self.encode = encode
+
+
+# The field types, by packet.types class
+TYPES = {
+    BYTE: Scalar('B', BYTE, int),
+    WORD: Scalar('H', WORD, int),
+    DWORD: Scalar('I', DWORD, int),
+    RGB: Scalar('3s', RGB, bytes),
+    Resolution: Scalar('3s', Resolution, bytes),
+}
+
+
+class Field:
+    """A single field of a packet layout.
+
+       Fields are installed on the packet class as descriptors, the values
+       are held by the fixed size 'values' list of the packet. Fields which
+       are not set are decoded from the raw data kept by Raw.load(), then
+       cached.
+
+    Parameters
+    ----------
+    name : str
+        The attribute holding the decoded value.
+    type : type|Bytes
+        BYTE, WORD, DWORD, RGB, Resolution or a Bytes/Text instance.
+    expect : object
+        When given, decoded values are validated against it.
+    default : object
+        The value of new packets.
+
+    """
+
+    def __init__(self, name: str, type, expect=None, default=None):
+        self.name = name
+        self.type = TYPES.get(type, type)
+        self.expect = expect
+        self.default = default
+        self.offset = None
+        self.position = None
+        self.struct = Struct('<' + self.type.format)
+
+    def __get__(self, packet, owner=None):
+        if packet is None:
+            return self
+
+        value = packet.values[self.position]
+        if value is UNSET:
+            if packet.raw is None:
+                raise AttributeError("'%s' has not been set" % self.name)
+            value = self.load(packet)
+        return value
+
+    def __set__(self, packet, value) -> None:
+        packet.values[self.position] = value
+
+    def load(self, packet):
+        """Decodes the field from the raw data of the packet."""
+        value = self.type.decode(self.struct.unpack_from(packet.raw, self.offset)[0])
+        packet.values[self.position] = value
+        return value
+
+
+class Layout:
+    """Declares the fields following the 4 byte header of a packet.
+
+       The fields are laid out back to back and compiled into a single
+       Struct, so a packet is packed or unpacked in one call. The same
+       schema drives Raw.encode(), Raw.decode(), __repr__ and dump().
+
+       Encoding stops at the first field which is neither set, loaded nor
+       has a default, the remainder of the packet is padded. This allows read
+       requests to be built from the same class as the written packets.
+    """
+
+    def __init__(self, *fields: Field):
+        self.fields = fields
+        self.offsets = []
+        offset = 4
+        for position, field in enumerate(fields):
+            field.offset = offset
+            field.position = position
+            self.offsets.append(offset)
+            offset += field.type.size
+        self.end = offset
+
+        # The values of new and of loaded packets
+        self.initial = [UNSET if field.default is None else field.default for field in fields]
+        self.unset = [UNSET] * len(fields)
+
+        self.struct = self._compile(len(fields))
+        self.prefixes = {len(fields): self.struct}
+
+        # Fast path, packing the header along with the fields
+        self.decoders = [field.type.decode for field in fields]
+        self.frames = {}
+
+    def _compile(self, count: int, header: str = '') -> Struct:
+        return Struct('<' + header + ''.join(field.type.format for field in self.fields[:count]))
+
+    def names(self) -> list:
+        return [field.name for field in self.fields]
+
+    def values(self, packet) -> list:
+        """The raw values to encode, up to the first missing field."""
+        values = []
+        for field, value in zip(self.fields, packet.values):
+            if value is UNSET:
+                if packet.raw is None:
+                    break
+                value = field.load(packet)
+            if value is None:
+                break
+            values.append(field.type.encode(value))
+        return values
+
+    def encode(self, packet, blob) -> None:
+        values = self.values(packet)
+        if not values:
+            return
+
+        struct = self.prefixes.get(len(values))
+        if struct is None:
+            struct = self.prefixes[len(values)] = self._compile(len(values))
+        blob.writeStruct(struct, values)
+
+    def decode(self, packet, blob) -> None:
+        values = packet.values
+        for field, value in zip(self.fields, blob.readStruct(self.struct)):
+            value = field.type.decode(value)
+            if field.expect is not None:
+                validate(value, field.expect, field=field.name)
+            values[field.position] = value
+
+    def pack_into(self, packet, target) -> None:
+        """Encodes a whole packet into a 64 byte buffer, without validation."""
+        values = self.values(packet)
+        struct = self.frames.get(len(values))
+        if struct is None:
+            struct = self.frames[len(values)] = self._compile(len(values), 'BBBB')
+
+        struct.pack_into(target, 0, packet.mode, packet.operation, packet.index, packet.flags, *values)
+        end = struct.size
+        padding = packet.padding
+        if padding:
+            target[end:end + len(padding)] = padding
+            end += len(padding)
+        target[end:64] = fill(packet.padChar)[end:]
+
+    def unpack(self, packet, data):
+        """Decodes a whole packet, the header and expected values are not checked."""
+        packet.values = [decode(value) for decode, value in zip(self.decoders, self.struct.unpack_from(data, 4))]
+        packet.padding = bytes(data[4 + self.struct.size:64])
+        return packet
+
+    def load(self, packet, data):
+        """Keeps the raw data, fields are only decoded once accessed."""
+        packet.values = self.unset[:]
+        packet.raw = data
+        packet.padding = bytes(data[self.end:64])
+        return packet
+
+    def describe(self, data: bytes) -> list:
+        """One line per field of an encoded packet: offset, name, raw bytes."""
+        lines = []
+        for field, offset in zip(self.fields, self.offsets):
+            lines.append("0x%02X %-16s %s" % (offset, field.name, data[offset:offset + field.type.size].hex()))
+        return lines
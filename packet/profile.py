@@ -1,8 +1,9 @@
-from argparse import Namespace
+from types import SimpleNamespace
 from .raw import Raw
-from .blob import Blob
+from .registry import register
+from .layout import Layout, Field, Bytes
 from .types import BYTE, WORD, RGB, Resolution
-from debug import validate, validate_range, validate_tuple
+from debug import validate_range, validate_tuple
 
 MODE_FIRMWARE = 0x50
 MODE_WRITE = 0x51
@@ -10,38 +11,46 @@ MODE_READ = 0x52
 
 
 class Base(Raw):
+    __slots__ = ()
+
     def displayName(self) -> str:
         return 'Packet.Profile.%s' % self.__class__.__name__
 
 
-# 0x52 0x96 0x00 0x00
+# 0x52/0x51 0x96 0x00 0x00
 class Anon_96(Base):
-    def __init__(self):
-        super().__init__(MODE_READ, 0x96, 0x00, 0x00)
+    __slots__ = ()
+
+    def __init__(self, mode=MODE_READ):
+        super().__init__(mode, 0x96, 0x00, 0x00)
 
-    def decode(self, blob: Blob) -> None:
-        n = 0
-        while n < 30:
-            validate(blob.readWord(), 0x0000)
-            n += 1
+    layout = Layout(
+        Field('unknown_01', Bytes(60), expect=bytes(60))
+    )
 
 
 # 0x51 0x28 0x00 0x00 - Read once during application start
 class Anon_28(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_WRITE, 0x28, 0x00, 0x00)
 
-    def encode(self, blob: Blob) -> None:
-        blob.writeBytes(BYTE(0xE0))
+    layout = Layout(
+        Field('unknown_01', BYTE, default=BYTE(0xE0))
+    )
 
 
 # 0x52 0x29 0x00 0x00 - Read once during application start
 class Anon_29(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_READ, 0x29, 0x00, 0x00)
 
-    def decode(self, blob: Blob) -> None:
-        self.unknown_01 = validate(blob.readWord(0x00E0))
+    layout = Layout(
+        Field('unknown_01', WORD, expect=0x00E0)
+    )
 
 
 # 0x52/0x51 0x28 0x00 0x00 - The description could be wrong
@@ -57,14 +66,14 @@ class Active(Base):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, mode=MODE_WRITE):
         super().__init__(mode, 0x28, 0x00, 0x00)
 
-    def encode(self, blob: Blob) -> None:
-        blob.writeBytes(self.id)
-
-    def decode(self, blob: Blob) -> None:
-        self.id = blob.readWord()  # This could easily be a byte
+    layout = Layout(
+        Field('id', WORD)  # This could easily be a byte
+    )
 
 
 # 0x51/0x52 0x2C 0x01 0x00
@@ -78,34 +87,26 @@ class EffectSettings(Base):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, id: int, mode=MODE_WRITE):
         super().__init__(mode, 0x2C, 0x01, 0x00)
         self.id = BYTE(id)
 
-    def encode(self, blob: Blob) -> None:
-        blob.writeBytes(self.id)
-
-        if hasattr(self, 'p1'):
-            blob.writeBytes(self.p1)
-            blob.writeBytes(self.p2)
-            blob.writeBytes(self.p3)
-            blob.writeBytes(self.p4)
-            blob.writeBytes(self.p5)
-            blob.writeBytes(self.rgb_1)
-            blob.writeBytes(self.rgb_2)
-
-    def decode(self, blob: Blob) -> None:
-        self.id = blob.readByte()
-        self.p1 = blob.readByte()
-        self.p2 = blob.readByte()
-        self.p3 = blob.readByte()
-        self.p4 = blob.readByte()
-        self.p5 = blob.readByte()
-        self.rgb_1 = RGB(blob.readBytes(3))
-        self.rgb_2 = RGB(blob.readBytes(3))
+    layout = Layout(
+        Field('id', BYTE),
+        Field('p1', BYTE),
+        Field('p2', BYTE),
+        Field('p3', BYTE),
+        Field('p4', BYTE),
+        Field('p5', BYTE),
+        Field('rgb_1', RGB),
+        Field('rgb_2', RGB)
+    )
 
     def setId(self, id: BYTE) -> None:
         self.id = id
+        self.dirty = True
 
     def getId(self) -> BYTE:
         return self.id
@@ -113,6 +114,7 @@ class EffectSettings(Base):
     def setParam(self, index: int, value: BYTE) -> None:
         assert index >= 1 and index <= 5, "Index out of range"
         setattr(self, "p%d" % index, value)
+        self.dirty = True
 
     def getParam(self, index: int) -> BYTE:
         assert index >= 1 and index <= 5, "Index out of range"
@@ -123,16 +125,19 @@ class EffectSettings(Base):
         existing = getattr(self, "p%d" % index)
         existing |= value
         setattr(self, "p%d" % index, existing)
+        self.dirty = True
 
     def notParam(self, index: int, value: BYTE) -> None:
         assert index >= 1 and index <= 5, "Index out of range"
         existing = getattr(self, "p%d" % index)
         existing &= ~value
         setattr(self, "p%d" % index, existing)
+        self.dirty = True
 
     def setRGB(self, index: int, value: RGB) -> None:
         assert index >= 1 and index <= 2, "Index out of range"
         setattr(self, "rgb_%d" % index, value)
+        self.dirty = True
 
     def getRGB(self, index: int) -> RGB:
         assert index >= 1 and index <= 2, "Index out of range"
@@ -141,22 +146,28 @@ class EffectSettings(Base):
 
 # 0x51/0x52 0xA0 0x01 0x00
 class ApplyActive(Base):
+    __slots__ = ()
+
     def __init__(self, mode=MODE_WRITE):
         super().__init__(mode, 0xA0, 0x01, 0x00)
 
-    def encode(self, blob: Blob) -> None:
-        return
+    # NOTE entry_3 is repeated 15 times than followed by zeros (kept as padding)
+    layout = Layout(
+        Field('unknown_02', BYTE, expect=0x00),
+        Field('count', BYTE, expect=0x03),  # Third entry will be 0xFE if disabled
+        Field('unknown_03', WORD, expect=0x0000),
+        Field('entry_1', BYTE, expect=0x05),
+        Field('entry_2', BYTE, expect=0x06),
+        Field('entry_3', BYTE)
+    )
 
-    def decode(self, blob: Blob) -> None:
-        self.unknown_02 = validate(blob.readByte(), 0x00)
-        self.count = validate(blob.readByte(), 0x03)  # Third entry will be 0xFE if disabled
-        self.unknown_03 = validate(blob.readWord(), 0x0000)
-        self.entry_1 = validate(blob.readByte(), 0x05)
-        self.entry_2 = validate(blob.readByte(), 0x06)
-        self.entry_3 = blob.readByte()
+    def getRingEffect(self) -> BYTE:
+        return self.entry_3
 
-        # NOTE entry_3 is repeated 15 times than followed by zeros
-        self.padding = blob.readBytes(53)
+    def setRingEffect(self, id: BYTE) -> None:
+        self.entry_3 = BYTE(id)
+        self.padding = bytes(self.entry_3) * 14 + b'\x00' * 39
+        self.dirty = True
 
 
 # 0x51/0x52 0x70 <index> <zone>
@@ -175,42 +186,47 @@ class BreathPage(Base):
         These pages are written during application startup.
     """
 
+    __slots__ = ()
+
+    PAGES = 5
+    COLORS = 85
+    SIZE = 60
+
     def __init__(self, index, zone, mode=MODE_WRITE):
-        self.data = None
         super().__init__(mode, 0x70, index, zone)
+        self.data = None
 
-    def encode(self, blob: Blob) -> None:
-        if self.data is not None:
-            blob.writeBytes(self.data)
+    layout = Layout(
+        Field('data', Bytes(60))
+    )
 
-    def decode(self, blob: Blob) -> None:
-        self.data = blob.readBytes(60)
+    def setData(self, data: bytes) -> None:
+        assert len(data) == BreathPage.SIZE, "Expected %d bytes, got %d" % (BreathPage.SIZE, len(data))
+        self.data = bytes(data)
+        self.dirty = True
+
+    def getData(self) -> bytes:
+        return self.data
 
 
 # 0x51/0x52 0x71 0x00 0x00
 class MirageResolution(Base):
+    __slots__ = ()
+
     def __init__(self, mode=MODE_WRITE):
         super().__init__(mode, 0x71, 0x00, 0x00)
 
-    def encode(self, blob: Blob) -> None:
-        blob.writeBytes(self.index_1)
-        blob.writeBytes(self.off)
-        blob.writeBytes(self.index_2)
-        blob.writeBytes(self.res_r)
-        blob.writeBytes(self.index_3)
-        blob.writeBytes(self.res_g)
-        blob.writeBytes(self.index_4)
-        blob.writeBytes(self.res_b)
-
-    def decode(self, blob: Blob) -> None:
-        self.index_1 = validate(blob.readByte(), 0x01)
-        self.off = Resolution(validate(blob.readBytes(3), b'\x00\xFF\x4A'))
-        self.index_2 = validate(blob.readByte(), 0x02)
-        self.res_r = Resolution(blob.readBytes(3))
-        self.index_3 = validate(blob.readByte(), 0x03)
-        self.res_g = Resolution(blob.readBytes(3))
-        self.index_4 = validate(blob.readByte(), 0x04)
-        self.res_b = Resolution(blob.readBytes(3))
+    # The 'off' value is below Resolution.Min, so it is kept as raw bytes
+    layout = Layout(
+        Field('index_1', BYTE, expect=0x01, default=BYTE(0x01)),
+        Field('off', Bytes(3), expect=b'\x00\xFF\x4A', default=b'\x00\xFF\x4A'),
+        Field('index_2', BYTE, expect=0x02, default=BYTE(0x02)),
+        Field('res_r', Resolution),
+        Field('index_3', BYTE, expect=0x03, default=BYTE(0x03)),
+        Field('res_g', Resolution),
+        Field('index_4', BYTE, expect=0x04, default=BYTE(0x04)),
+        Field('res_b', Resolution)
+    )
 
     def getResolutions(self) -> tuple:
         return (
@@ -227,6 +243,7 @@ class MirageResolution(Base):
             self.res_r = values[0]
             self.res_g = values[1]
             self.res_b = values[2]
+        self.dirty = True
 
     # def setResolution(self, which: str, value: Resolution) -> None:
     #     assert which in ['r', 'g', 'b'], "Unknown offset '%s', expected 'r', 'g' or 'b'" % which
@@ -265,63 +282,75 @@ class MorsePage(Base):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, index: int, mode: int = MODE_WRITE):
         super().__init__(mode, 0x73, index, 0x00)
         self.data = b''
 
-    def encode(self, blob: Blob) -> None:
-        blob.writeBytes(self.data)
+    layout = Layout(
+        Field('data', Bytes(60))
+    )
+
+    def getData(self) -> bytes:
+        return self.data
 
-    def decode(self, blob: Blob) -> None:
-        self.data = blob.readBytes(60)
+    def setData(self, data: bytes) -> None:
+        validate_range(len(data), 0, 60)
+        self.data = data
+        self.dirty = True
 
 
 # 0x52 0x94 0x00 0x00
 class MirageFrequencies(Base):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(MODE_READ, 0x94, 0x00, 0x00)
 
-    def encode(self, blob: Blob) -> None:
-        blob.writeBytes(self.count)
-        blob.writeBytes(self.r_1)
-        blob.writeBytes(self.g_1)
-        blob.writeBytes(self.b_1)
-        blob.writeBytes(self.r_2)
-        blob.writeBytes(self.g_2)
-        blob.writeBytes(self.b_2)
-        blob.writeBytes(self.r_3)
-        blob.writeBytes(self.g_3)
-        blob.writeBytes(self.b_3)
-
-    def decode(self, blob: Blob) -> None:
-        self.count = validate(blob.readByte(), 0x03)
-        self.r_1 = blob.readWord()
-        self.g_1 = blob.readWord()
-        self.b_1 = blob.readWord()
-        self.r_2 = blob.readWord()
-        self.g_2 = blob.readWord()
-        self.b_2 = blob.readWord()
-        self.r_3 = blob.readWord()
-        self.g_3 = blob.readWord()
-        self.b_3 = blob.readWord()
+    layout = Layout(
+        Field('count', BYTE, expect=0x03),
+        Field('r_1', WORD),
+        Field('g_1', WORD),
+        Field('b_1', WORD),
+        Field('r_2', WORD),
+        Field('g_2', WORD),
+        Field('b_2', WORD),
+        Field('r_3', WORD),
+        Field('g_3', WORD),
+        Field('b_3', WORD)
+    )
 
     def getFrequency(self, slot: int) -> tuple:
         validate_range(slot, 0, 2)
         return (
-            getattr(self, 'r_%d' % slot),
-            getattr(self, 'g_%d' % slot),
-            getattr(self, 'b_%d' % slot),
+            getattr(self, 'r_%d' % (slot + 1)),
+            getattr(self, 'g_%d' % (slot + 1)),
+            getattr(self, 'b_%d' % (slot + 1)),
         )
 
     def setFrequency(self, slot: int, value: tuple) -> None:
         validate_range(slot, 0, 2)
         validate_tuple(value, (int, int, int))
-        setattr(self, 'r_%d' % slot, WORD(value[0]))
-        setattr(self, 'g_%d' % slot, WORD(value[1]))
-        setattr(self, 'b_%d' % slot, WORD(value[2]))
-
-
-Profile = Namespace(
+        setattr(self, 'r_%d' % (slot + 1), WORD(value[0]))
+        setattr(self, 'g_%d' % (slot + 1), WORD(value[1]))
+        setattr(self, 'b_%d' % (slot + 1), WORD(value[2]))
+        self.dirty = True
+
+
+# Anon_28 and Active share their operation, told apart by the mode
+register(Anon_96, (MODE_READ, MODE_WRITE), 0x96)
+register(Anon_28, MODE_WRITE, 0x28)
+register(Active, MODE_READ, 0x28)
+register(Anon_29, MODE_READ, 0x29)
+register(EffectSettings, (MODE_READ, MODE_WRITE), 0x2C)
+register(ApplyActive, (MODE_READ, MODE_WRITE), 0xA0)
+register(BreathPage, (MODE_READ, MODE_WRITE), 0x70)
+register(MirageResolution, (MODE_READ, MODE_WRITE), 0x71)
+register(MorsePage, (MODE_READ, MODE_WRITE), 0x73)
+register(MirageFrequencies, (MODE_READ, MODE_WRITE), 0x94)
+
+Profile = SimpleNamespace(
     MODE_FIRMWARE=MODE_FIRMWARE,
     MODE_READ=MODE_READ,
     MODE_WRITE=MODE_WRITE,
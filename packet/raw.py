@@ -14,13 +14,50 @@ class Raw:
 
     """
 
-    mode = None
-    operation = None
+    # Derived classes declare __slots__ too, their fields are held by the
+    # 'values' list of the layout
+    __slots__ = ('mode', 'operation', 'index', 'flags', 'padChar', 'padding', 'dirty', 'raw', 'values', 'dwords')
+
+    # The fields following the header, see Layout
+    layout = None
+    # The fields listed by __repr__ and indexed by __getitem__
+    names = ('mode', 'operation', 'index', 'flags', 'dwords')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.names = cls.names + tuple(cls.__dict__.get('__slots__', ()))
+
+        # The fields of the layout are descriptors, see Field
+        if 'layout' in cls.__dict__ and cls.layout is not None:
+            layout = cls.layout
+            cls.names = Raw.names[:4] + tuple(field.name for field in layout.fields)
+            for field in layout.fields:
+                setattr(cls, field.name, field)
+
+            # The validation free codec, see Driver(strict=False)
+            def pack_into(self, target) -> None:
+                layout.pack_into(self, target)
+
+            def unpack(self, data):
+                return layout.unpack(self, data)
+
+            def load(self, data):
+                return layout.load(self, data)
+
+            cls.pack_into = pack_into
+            cls.unpack = unpack
+            cls.load = load
 
     def __init__(self, mode: int = None, operation: int = None, index: int = None, flags: int = None,
                  data: bytes = None, padChar: bytes = b'\x00'):
         self.padChar = padChar
         self.padding = b''
+        # Set by the setters of derived classes, cleared once flushed to the device
+        self.dirty = False
+        # The response kept by load(), decoded on demand
+        self.raw = None
+        if self.layout is not None:
+            self.values = self.layout.initial[:]
 
         if data is not None and len(data) >= 4:
             if mode is None:
@@ -71,7 +108,8 @@ class Raw:
             self.flags = blob.readByte()
 
     def encode(self, blob: Blob) -> None:
-        return
+        if self.layout is not None:
+            self.layout.encode(self, blob)
 
     def decode(self, blob: Blob) -> None:
         """Reads the remaining 62 bytes of a 64 byte packet.
@@ -89,13 +127,15 @@ class Raw:
             If trying to read more than 64 bytes.
 
         """
-        c = 0
-        while c < 15:
-            setattr(self, "dword%02d" % c, blob.readDword())
-            c += 1
+        if self.layout is not None:
+            self.layout.decode(self, blob)
+            return
+
+        self.dwords = tuple(blob.readDword() for c in range(15))
 
-    def to_blob(self) -> Blob:
-        blob = Blob(debug=False, padChar=self.padChar)
+    def to_blob(self, target=None) -> Blob:
+        """Encodes the packet, in place when given a 64 byte target buffer."""
+        blob = Blob(debug=False, padChar=self.padChar, target=target)
         blob.writeBytes(self.mode)
         blob.writeBytes(self.operation)
         blob.writeBytes(self.index)
@@ -107,7 +147,14 @@ class Raw:
         return blob
 
     def dump(self):
-        self.to_blob().dump()
+        blob = self.to_blob()
+        blob.dump()
+        if self.layout is not None:
+            for line in self.layout.describe(bytes(blob)):
+                print("    " + line)
+        elif hasattr(self, 'dwords'):
+            for line in self._dwords():
+                print("    " + line)
 
     def update(self, byteStr: bytes):
         blob = Blob(byteStr, padChar=self.padChar)
@@ -116,13 +163,35 @@ class Raw:
             self.decode(blob)
             if blob.remain() > 0:
                 self.padding = blob.readBytes(blob.remain())
+            blob.close()
         except AssertionError as error:
-            print(error)
-            blob.debug = False  # suppress the __del__ error checking
-            blob.dump()
-            return ErrorResponse(byteStr)
+            # Rendering the error is left to the caller, the traceback is
+            # dropped so the response does not keep this frame alive
+            response = ErrorResponse(byteStr)
+            response.error = error.with_traceback(None)
+            return response
         return self
 
+    def pack_into(self, target) -> None:
+        """Encodes into a 64 byte buffer, skipping validation where possible.
+
+           Packets declaring a layout are packed in a single call, others
+           fall back to to_blob().
+        """
+        self.to_blob(target)
+
+    def unpack(self, data: bytes):
+        """Decodes a response without validating it, see pack_into()."""
+        return self.update(data)
+
+    def load(self, data: bytes):
+        """Keeps the response, decoding each field on first access.
+
+           Like unpack() nothing is validated. Packets without a layout are
+           decoded right away.
+        """
+        return self.unpack(data)
+
     def displayName(self):
         return 'Packet.Raw'
 
@@ -130,22 +199,42 @@ class Raw:
         return bytes(self.to_blob())
 
     def __getitem__(self, i):
-        return getattr(self, list(self.__dict__)[i])
+        return getattr(self, self.names[i])
 
     def __len__(self):
-        return len(self.__dict__)
+        return len(self.names)
 
     def __repr__(self):
         # str = 'Packet.%s(' % self.__class__.__name__
         str = '%s(' % self.displayName()
-        for field in self.__dict__:
-            if field in ['padChar', 'padding']:
-                continue
-            str += "\n    %s: %s" % (field, getattr(self, field))
+        for field in self.fields():
+            if field == 'dwords':
+                str += ''.join("\n    " + line for line in self._dwords())
+            else:
+                str += "\n    %s: %s" % (field, getattr(self, field))
         return str + "\n)"
 
+    def _dwords(self) -> list:
+        """The dwords of a packet without a layout, one 'dwordNN: 0x...' line each."""
+        return ["dword%02d: 0x%08X" % (c, dword) for (c, dword) in enumerate(self.dwords)]
+
+    def fields(self) -> list:
+        """The names of the header fields and the decoded fields."""
+        if self.layout is None:
+            return [field for field in self.names if hasattr(self, field)]
+
+        fields = list(self.names[:4])
+        for field in self.layout.fields:
+            if getattr(self, field.name, None) is None:
+                break
+            fields.append(field.name)
+        return fields
+
 
 class ErrorResponse(Raw):
+    # 'error' holds the ValidationError when a response failed to decode
+    __slots__ = ('prev_mode', 'prev_operation', 'prev_index', 'prev_flags', 'error')
+
     def __init__(self, data: bytes):
         super().__init__(data=data)
 
@@ -0,0 +1,98 @@
+from importlib import import_module
+from .blob import Blob
+from .raw import Raw, ErrorResponse
+
+
+# (mode, operation) -> packet class
+CLASSES = {}
+# The modules registering packet classes, imported on the first lookup
+MODULES = ('profile', 'control', 'firmware')
+_loaded = False
+
+
+def load() -> dict:
+    """Imports every packet module, so that all classes are registered."""
+    global _loaded
+    if not _loaded:
+        for module in MODULES:
+            import_module('.' + module, __package__)
+        _loaded = True
+    return CLASSES
+
+
+def register(cls, modes, operation: int) -> None:
+    """Registers the packet class decoding frames with the given header.
+
+    Parameters
+    ----------
+    cls : type
+        The Packet.Raw subclass.
+    modes : int|tuple
+        The mode byte(s) the packet is sent with.
+    operation : int
+        The operation byte.
+
+    """
+
+    if isinstance(modes, int):
+        modes = (modes,)
+
+    for mode in modes:
+        CLASSES[(mode, operation)] = cls
+
+
+def lookup(frame) -> type:
+    """The packet class of a 64 byte frame, Raw if it is not known."""
+    if not _loaded:
+        load()
+    return CLASSES.get((frame[0], frame[1]), Raw)
+
+
+def decode_frame(frame, lazy: bool = False) -> Raw:
+    """Decodes any 64 byte frame into the packet class matching its header.
+
+       The class is found with a single dictionary lookup, its constructor
+       is bypassed since the header is taken from the frame.
+
+    Parameters
+    ----------
+    frame : bytes
+        The raw 64 bytes, sent or received.
+    lazy : bool
+        Whether to decode the fields on access, see Raw.load(). Nothing is
+        validated: packets without a layout whose body does not decode
+        (e.g. read requests, sent with empty fields) keep their class and
+        header, the body is kept as plain dwords.
+
+    Returns
+    -------
+    Raw
+        The decoded packet, or an ErrorResponse for error responses and,
+        unless lazy, frames which fail to decode.
+
+    """
+
+    frame = bytes(frame)
+    if frame[0] == 0xFF and frame[1] == 0xAA:
+        return ErrorResponse(frame)
+
+    cls = lookup(frame)
+    packet = cls.__new__(cls)
+    Raw.__init__(packet, frame[0], frame[1], frame[2], frame[3])
+
+    if not lazy:
+        return packet.update(frame)
+    if cls.layout is not None:
+        return packet.load(frame)
+
+    # Packets without a layout validate while decoding
+    decoded = packet.update(frame)
+    if not isinstance(decoded, ErrorResponse):
+        return decoded
+
+    packet = cls.__new__(cls)
+    Raw.__init__(packet, frame[0], frame[1], frame[2], frame[3])
+    blob = Blob(frame)
+    blob.readBytes(4)
+    Raw.decode(packet, blob)
+    return packet
@@ -3,7 +3,7 @@ from debug import validate_type, validate_length
 
 
 class BYTESTR:
-    pass
+    __slots__ = ()
 
 
 class Resolution(BYTESTR):
@@ -19,6 +19,8 @@ class Resolution(BYTESTR):
        diveded until it fits within 2 bytes, then the number of divisions is stored in the
        first byte. This results in an unnoticable decrease of the true resolution.
     """
+    __slots__ = ('value',)
+
     Max = 1066666
     Min = 24000
 
@@ -46,7 +48,7 @@ class Resolution(BYTESTR):
         # assert isinstance(value, bytes), "Expected a bytes array, got %s" % type(value)
         # assert len(value) == 3, "Expected 3 bytes, got %d" % len(value)
 
-        (hi, lo) = unpack('BH', value)
+        (hi, lo) = unpack('<BH', value)
 
         if hi > 0:
             lo += 1
@@ -94,6 +96,8 @@ class RGB(BYTESTR):
 
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, r, g=None, b=None):
         if isinstance(r, int):
             validate_type(g, int)
@@ -128,13 +132,19 @@ class Number(int):
     Attributes
     ----------
     size : int
-        The size of the number (1, 2 or 4 bytes).
+        The size of the number (1, 2 or 4 bytes), a class attribute of BYTE,
+        WORD and DWORD. Numbers are created as one of these.
     value : int
         The integer value of the number.
 
     """
 
+    __slots__ = ()
+    size = None
+
     def __new__(self, byteStr, size: int = None):
+        if size is None:
+            size = self.size
         if type(byteStr) == bytes:
             # validate_type(byteStr, bytes)
             if size is None:
@@ -158,35 +168,56 @@ class Number(int):
             else:
                 raise RuntimeError('Invalid size: %d' % size)
 
-        inst = super(Number, self).__new__(self, value)
+        if self is Number:
+            self = SIZES[size]
 
-        inst.value = value
-        inst.size = size
+        return super(Number, self).__new__(self, value)
 
-        return inst
+    @property
+    def value(self) -> int:
+        return int(self)
 
     def __str__(self):
         if self.size is 1:
-            return "0x%02X" % self.value
+            return "0x%02X" % int(self)
         if self.size is 2:
-            return "0x%04X" % self.value
+            return "0x%04X" % int(self)
         if self.size is 4:
-            return "0x%08X" % self.value
+            return "0x%08X" % int(self)
 
     def __bytes__(self):
-        return self.value.to_bytes(self.size, 'little')
+        return int(self).to_bytes(self.size, 'little')
 
 
 class DWORD(Number):
+    __slots__ = ()
+    size = 4
+
     def __new__(self, value):
         return super(DWORD, self).__new__(self, value, 4)
 
 
 class WORD(Number):
+    __slots__ = ()
+    size = 2
+
     def __new__(self, value):
         return super(WORD, self).__new__(self, value, 2)
 
 
 class BYTE(Number):
+    """A single byte, plain BYTE values are interned (see BYTES)."""
+
+    __slots__ = ()
+    size = 1
+
     def __new__(self, value):
+        if self is BYTE:
+            if isinstance(value, int):
+                return BYTES[value & 0xff]
+            return BYTES[super(BYTE, self).__new__(self, value, 1)]
         return super(BYTE, self).__new__(self, value, 1)
+
+
+SIZES = {1: BYTE, 2: WORD, 4: DWORD}
+BYTES = tuple(int.__new__(BYTE, value) for value in range(256))
@@ -0,0 +1,144 @@
+from packet import Packet
+from effects import Effect, Mirage, Off
+from zone import Ring, Logo, Fan
+
+
+# Layout of the packet cache, see driver/plasma.h
+EFFECT_IDS = (0x00, 0x07, 0x0A, 0x09, 0x08, 0x0B, 0x02, 0x01)
+IDX_ZONE_LOGO = 8
+IDX_ZONE_FAN = 9
+IDX_ACTIVE_ZONES = 10
+IDX_MORSE_FIRST = 11
+MORSE_LENGTH = 8
+IDX_FREQUENCY = 19
+IDX_RESOLUTION = 20  # This packet cannot be read, it is only known once written
+TOTAL_PACKETS = 21
+
+ZONE_ID_LOGO = 0x05
+ZONE_ID_FAN = 0x06
+
+
+def cache_index(data) -> int:
+    """Returns the cache slot a (64 byte) profile packet belongs to, or None."""
+    if data[0] & 0xF0 != 0x50:
+        return None
+
+    operation = data[1]
+
+    if operation == 0x2C and data[2] == 0x01:
+        id = data[4]
+        if id in EFFECT_IDS:
+            return EFFECT_IDS.index(id)
+        if id == ZONE_ID_LOGO:
+            return IDX_ZONE_LOGO
+        if id == ZONE_ID_FAN:
+            return IDX_ZONE_FAN
+    elif operation == 0xA0 and data[2] == 0x01:
+        return IDX_ACTIVE_ZONES
+    elif operation == 0x73 and data[2] < MORSE_LENGTH:
+        return IDX_MORSE_FIRST + data[2]
+    elif operation == 0x94:
+        return IDX_FREQUENCY
+    elif operation == 0x71:
+        return IDX_RESOLUTION
+
+    return None
+
+
+class DeviceState:
+    """Python side copy of the packet cache held by the kernel driver.
+
+       The cache is filled once when the driver attaches and updated from
+       every response after that, so reads never touch the USB.
+
+       Packets are stored as received, with the mode normalized to MODE_READ.
+       The getters decode their fields lazily, the cached responses having
+       already been checked when received.
+    """
+
+    def __init__(self):
+        self.cache = bytearray(64 * TOTAL_PACKETS)
+        self.valid = [False] * TOTAL_PACKETS
+
+    def packets(self) -> list:
+        """The read packets needed to fill the cache (see initialize_cache)."""
+        Profile = Packet.Profile
+        packets = [Profile.EffectSettings(id, Profile.MODE_READ) for id in EFFECT_IDS]
+        packets.append(Profile.ApplyActive(Profile.MODE_READ))
+        packets.append(Profile.EffectSettings(ZONE_ID_FAN, Profile.MODE_READ))
+        packets.append(Profile.EffectSettings(ZONE_ID_LOGO, Profile.MODE_READ))
+        packets += [Profile.MorsePage(i, Profile.MODE_READ) for i in range(MORSE_LENGTH)]
+        packets.append(Profile.MirageFrequencies())
+        return packets
+
+    def fill(self, driver) -> None:
+        driver.post_many(self.packets())
+
+    def update(self, data: bytes) -> None:
+        index = cache_index(data)
+        if index is None:
+            return
+
+        offset = index * 64
+        self.cache[offset:offset + 64] = data
+        self.cache[offset] = Packet.Profile.MODE_READ
+        self.valid[index] = True
+
+    def differs(self, data: bytes) -> bool:
+        """Whether a packet, ignoring its mode, differs from the cached one."""
+        index = cache_index(data)
+        if index is None or not self.valid[index]:
+            return True
+
+        offset = index * 64
+        return self.cache[offset + 1:offset + 64] != data[1:]
+
+    def load(self, index: int) -> bytes:
+        if not self.valid[index]:
+            raise KeyError("Packet %d has not been cached" % index)
+        return bytes(self.cache[index * 64:(index + 1) * 64])
+
+    def getSettings(self, id: int) -> Packet.Profile.EffectSettings:
+        if id in EFFECT_IDS:
+            index = EFFECT_IDS.index(id)
+        elif id == ZONE_ID_LOGO:
+            index = IDX_ZONE_LOGO
+        elif id == ZONE_ID_FAN:
+            index = IDX_ZONE_FAN
+        else:
+            raise KeyError("Unknown effect id 0x%02X" % id)
+
+        settings = Packet.Profile.EffectSettings(id, Packet.Profile.MODE_READ)
+        return settings.load(self.load(index))
+
+    def getEffect(self, id: int) -> Effect:
+        return Effect.Factory(self.getSettings(id))
+
+    def getActiveZones(self) -> Packet.Profile.ApplyActive:
+        return Packet.Profile.ApplyActive(Packet.Profile.MODE_READ).load(self.load(IDX_ACTIVE_ZONES))
+
+    def getMorsePage(self, index: int) -> Packet.Profile.MorsePage:
+        page = Packet.Profile.MorsePage(index, Packet.Profile.MODE_READ)
+        return page.load(self.load(IDX_MORSE_FIRST + index))
+
+    def getFrequencies(self) -> Packet.Profile.MirageFrequencies:
+        return Packet.Profile.MirageFrequencies().load(self.load(IDX_FREQUENCY))
+
+    def getResolution(self) -> Packet.Profile.MirageResolution:
+        resolution = Packet.Profile.MirageResolution(Packet.Profile.MODE_READ)
+        return resolution.load(self.load(IDX_RESOLUTION))
+
+    def getRing(self) -> Ring:
+        id = self.getActiveZones().entry_3
+        if id in EFFECT_IDS:
+            return Ring(self.getEffect(id))
+        return Ring(Off(Packet.Profile.EffectSettings(id)))
+
+    def getLogo(self) -> Logo:
+        return Logo(self.getEffect(ZONE_ID_LOGO))
+
+    def getFan(self) -> Fan:
+        mirage = None
+        if self.valid[IDX_RESOLUTION]:
+            mirage = Mirage(self.getResolution(), self.getFrequencies())
+        return Fan(self.getEffect(ZONE_ID_FAN), mirage)
@@ -0,0 +1,286 @@
+import argparse
+import numpy as np
+from capture import Replayer, HEADER, RECORD, DIR_OUT, DIR_IN
+from packet.layout import Bytes, Text, Scalar
+from packet.types import BYTE, WORD, DWORD, RGB, Resolution
+from packet.registry import decode_frame, load
+
+
+# The 4 byte header shared by every packet, the body is left as raw bytes
+FRAME = np.dtype([
+    ('mode', 'u1'),
+    ('operation', 'u1'),
+    ('index', 'u1'),
+    ('flags', 'u1'),
+    ('body', 'u1', (60,)),
+])
+
+# Resolutions are stored as a divider and a 16 bit tick count, see Resolution.decode()
+RESOLUTION = np.dtype({'names': ['divider', 'ticks'], 'formats': ['u1', '<u2'], 'offsets': [0, 1], 'itemsize': 3})
+
+# The field dtypes, by packet.types class
+DTYPES = {
+    BYTE: np.dtype('u1'),
+    WORD: np.dtype('<u2'),
+    DWORD: np.dtype('<u4'),
+    RGB: np.dtype(('u1', (3,))),
+    Resolution: RESOLUTION,
+}
+
+# Trace records as stored by capture.Recorder
+RECORDS = np.dtype({
+    'names': ['timestamp', 'direction', 'data'],
+    'formats': ['<f8', 'u1', ('u1', (64,))],
+    'offsets': [0, 8, 16],
+    'itemsize': RECORD.size,
+})
+
+
+def dtype(cls) -> np.dtype:
+    """The structured dtype of a packet class, overlaying a whole 64 byte frame.
+
+       The fields are laid out as declared by the layout of the class, so a
+       column of the trace can be read as, e.g. store.view(EffectSettings)['p1'].
+
+    Parameters
+    ----------
+    cls : type
+        A Packet.Raw subclass.
+
+    Returns
+    -------
+    np.dtype
+        The header fields followed by the layout fields, 64 bytes wide.
+
+    """
+
+    names = ['mode', 'operation', 'index', 'flags']
+    formats = ['u1', 'u1', 'u1', 'u1']
+    offsets = [0, 1, 2, 3]
+
+    layout = getattr(cls, 'layout', None)
+    for field in layout.fields if layout is not None else ():
+        kind = field.type
+        if isinstance(kind, Text):
+            format = np.dtype('S%d' % kind.size)
+        elif isinstance(kind, Bytes):
+            format = np.dtype(('u1', (kind.size,)))
+        else:
+            assert isinstance(kind, Scalar), "Unknown field type %s" % type(kind)
+            format = DTYPES[kind.decode]
+
+        names.append(field.name)
+        formats.append(format)
+        offsets.append(field.offset)
+
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': 64})
+
+
+def resolutions(values) -> np.ndarray:
+    """Converts a column of RESOLUTION values to tick counts, see Resolution.decode()."""
+    divider = values['divider'].astype(np.uint32)
+    ticks = values['ticks'].astype(np.uint32)
+    return np.where(divider > 0, (ticks + 1) * (divider + 1), ticks)
+
+
+class TraceStore:
+    """Holds a whole capture as a single N x 64 array of bytes.
+
+       Every question about the capture is answered by vectorized operations
+       over the array instead of one Raw packet at a time: filtering by
+       header, grouping by packet type and per byte histograms all run in a
+       single pass, however many frames the capture holds.
+
+       Frames are only decoded into packets on request, see packet().
+
+    Parameters
+    ----------
+    frames : np.ndarray
+        The frames, N x 64 uint8.
+    timestamps : np.ndarray
+        The time of each frame (seconds since the epoch), zeros when unknown.
+    directions : np.ndarray
+        DIR_OUT or DIR_IN for each frame, DIR_OUT when unknown.
+
+    """
+
+    def __init__(self, frames, timestamps=None, directions=None):
+        frames = np.ascontiguousarray(frames, dtype=np.uint8)
+        assert frames.ndim == 2 and frames.shape[1] == 64, "Expected N x 64 frames, got %s" % (frames.shape,)
+
+        self.frames = frames
+        self.timestamps = np.zeros(len(frames)) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        self.directions = np.full(len(frames), DIR_OUT, dtype=np.uint8) if directions is None \
+            else np.asarray(directions, dtype=np.uint8)
+
+    @classmethod
+    def load(cls, path: str) -> 'TraceStore':
+        """Loads a trace recorded by capture.Recorder, copying the frames once."""
+        with Replayer(path) as replayer:
+            records = np.frombuffer(replayer.map, dtype=RECORDS, count=len(replayer), offset=HEADER.size)
+            store = cls(records['data'], records['timestamp'].copy(), records['direction'].copy())
+            del records
+        return store
+
+    @classmethod
+    def from_frames(cls, frames, directions=None) -> 'TraceStore':
+        """Builds a store from any iterable of 64 byte frames."""
+        data = b''.join(bytes(frame) for frame in frames)
+        return cls(np.frombuffer(data, dtype=np.uint8).reshape(-1, 64), directions=directions)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, selection) -> 'TraceStore':
+        """A store holding the selected frames, by mask, indices or slice."""
+        if isinstance(selection, int):
+            selection = slice(selection, selection + 1)
+        return TraceStore(self.frames[selection], self.timestamps[selection], self.directions[selection])
+
+    @property
+    def header(self) -> np.ndarray:
+        """The frames as FRAME records, a view sharing the same memory."""
+        return self.frames.view(FRAME)[:, 0]
+
+    @property
+    def keys(self) -> np.ndarray:
+        """The (mode, operation) of each frame as a single 16 bit number."""
+        return (self.frames[:, 0].astype(np.uint16) << 8) | self.frames[:, 1]
+
+    def view(self, cls) -> np.ndarray:
+        """The frames as records of a packet class, see dtype()."""
+        return self.frames.view(dtype(cls))[:, 0]
+
+    def where(self, mode: int = None, operation: int = None, index: int = None, flags: int = None,
+              direction: int = None, cls=None) -> np.ndarray:
+        """A mask of the frames matching every given criteria.
+
+        Parameters
+        ----------
+        mode, operation, index, flags : int
+            The expected header bytes.
+        direction : int
+            DIR_OUT or DIR_IN.
+        cls : type
+            A packet class, matching every header it is registered with.
+
+        Returns
+        -------
+        np.ndarray
+            A boolean mask, usable to index the store.
+
+        """
+
+        frames = self.frames
+        mask = np.ones(len(frames), dtype=bool)
+        for (position, value) in enumerate((mode, operation, index, flags)):
+            if value is not None:
+                mask &= frames[:, position] == value
+        if direction is not None:
+            mask &= self.directions == direction
+
+        if cls is not None:
+            matches = np.zeros(len(frames), dtype=bool)
+            for (key, registered) in load().items():
+                if registered is cls:
+                    matches |= (frames[:, 0] == key[0]) & (frames[:, 1] == key[1])
+            mask &= matches
+
+        return mask
+
+    def requests(self) -> 'TraceStore':
+        return self[self.directions == DIR_OUT]
+
+    def responses(self) -> 'TraceStore':
+        return self[self.directions == DIR_IN]
+
+    def group(self, columns: tuple = (0, 1)) -> dict:
+        """Groups the frames by the value of the given byte columns.
+
+        Parameters
+        ----------
+        columns : tuple
+            The offsets of the bytes to group by, the mode and operation by
+            default.
+
+        Returns
+        -------
+        dict
+            The indices of the frames, keyed by the tuple of grouped values.
+
+        """
+
+        keys = np.zeros(len(self.frames), dtype=np.uint64)
+        for column in columns:
+            keys = (keys << np.uint64(8)) | self.frames[:, column]
+
+        (unique, inverse) = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(unique) + 1))
+
+        groups = {}
+        for (i, key) in enumerate(unique.tolist()):
+            values = tuple((key >> (8 * shift)) & 0xFF for shift in reversed(range(len(columns))))
+            groups[values] = order[bounds[i]:bounds[i + 1]]
+        return groups
+
+    def histogram(self) -> np.ndarray:
+        """Counts every value of every byte, in a single pass.
+
+        Returns
+        -------
+        np.ndarray
+            64 x 256 counts, the occurrences of each value at each offset.
+
+        """
+
+        flat = self.frames.astype(np.intp) + np.arange(0, 64 * 256, 256, dtype=np.intp)
+        return np.bincount(flat.ravel(), minlength=64 * 256).reshape(64, 256)
+
+    def varying(self) -> np.ndarray:
+        """The offsets of the bytes taking more than one value across the frames."""
+        if not len(self.frames):
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero((self.frames != self.frames[0]).any(axis=0))
+
+    def summary(self) -> list:
+        """One line per varying byte: offset, distinct values and the most common ones."""
+        histogram = self.histogram()
+        lines = []
+        for offset in self.varying():
+            counts = histogram[offset]
+            common = np.argsort(counts)[::-1][:4]
+            lines.append("0x%02X %3d values  %s" % (offset, np.count_nonzero(counts), ' '.join(
+                "%02X:%d" % (value, counts[value]) for value in common if counts[value])))
+        return lines
+
+    def packet(self, position: int, lazy: bool = False):
+        """Decodes a single frame, see decode_frame()."""
+        return decode_frame(self.frames[position].tobytes(), lazy)
+
+    def packets(self, lazy: bool = True):
+        """Decodes every frame, in order."""
+        for frame in self.frames:
+            yield decode_frame(frame.tobytes(), lazy)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Summarizes the frames of a packet trace.')
+    parser.add_argument('path', help='The trace file, see capture.py.')
+    parser.add_argument('--responses', action='store_true', help='Only summarize the received frames.')
+    args = parser.parse_args()
+
+    store = TraceStore.load(args.path)
+    if args.responses:
+        store = store.responses()
+
+    for (key, indices) in store.group().items():
+        group = store[indices]
+        name = group.packet(0, lazy=True).displayName()
+        print("%02X %02X  %-36s %d frames" % (key[0], key[1], name, len(group)))
+        for line in group.summary():
+            print('    ' + line)
+
+
+if __name__ == '__main__':
+    main()
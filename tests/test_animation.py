@@ -0,0 +1,20 @@
+from animation import Engine, hue
+from effects import Static
+from emulator import EmulatedDriver
+from packet.types import RGB
+from zone import Ring
+
+
+def test_stats_per_track_count_delivered_frames():
+    driver = EmulatedDriver()
+    driver.attach()
+
+    engine = Engine(driver)
+    engine.add(Ring(Static(driver.state.getSettings(0x00))), hue(1.0), 50)
+    engine.add(Ring(Static(driver.state.getSettings(0x0B))), lambda t: RGB(0x10, 0x20, 0x30), 50)
+    [changing, constant] = engine.run(0.2)
+
+    assert changing['zone'] == constant['zone'] == 'Ring'
+    assert changing['sent'] > 1
+    assert constant['sent'] == 1 and constant['skipped'] > 0
+    assert constant['fps'] < constant['render_fps']
@@ -0,0 +1,33 @@
+import asyncio
+from asyncdriver import AsyncDriver
+from emulator import Emulator, EmulatedDriver
+from packet import Packet
+
+
+def test_close_waits_for_the_queued_transfers_without_blocking_the_loop():
+    async def run():
+        driver = AsyncDriver(EmulatedDriver(Emulator(latency=0.002)))
+        await driver.attach()
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        batch = driver.post_many([Packet.Profile.Anon_96()] * 20)
+        await driver.close()
+        task.cancel()
+
+        responses = await batch
+        return driver, responses, ticks
+
+    driver, responses, ticks = asyncio.run(run())
+
+    assert [response.displayName() for response in responses] == ['Packet.Profile.Anon_96'] * 20
+    assert driver.driver.device is None
+    # The loop kept running while the batch and the detach were in flight
+    assert ticks > 1
@@ -0,0 +1,23 @@
+import time
+from capture import Recorder, Replayer
+from emulator import EmulatedDriver
+from packet import Packet
+
+
+def test_sessions_appended_to_a_trace_share_a_clock(tmp_path):
+    path = str(tmp_path / 'trace.bin')
+    before = time.time()
+    for _ in range(2):
+        driver = EmulatedDriver()
+        driver.attach()
+        with Recorder(path).attach(driver):
+            driver.post(Packet.Firmware.Version())
+    after = time.time()
+
+    with Replayer(path) as replayer:
+        timestamps = [timestamp for (timestamp, _, _) in replayer.records()]
+        assert len(timestamps) == 4
+        assert timestamps == sorted(timestamps)
+        assert before <= timestamps[0] and timestamps[-1] <= after
+
+        assert replayer.replay(EmulatedDriver())['mismatches'] == 0
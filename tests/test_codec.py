@@ -0,0 +1,75 @@
+import pytest
+from driver import encode_strict, encode_fast, decode_strict, decode_fast, decode_lazy
+from emulator import Emulator
+from packet import Packet
+from packet.raw import Raw
+from packet.registry import lookup, load
+from state import IDX_RESOLUTION
+
+Profile = Packet.Profile
+
+# A request for each packet class, the emulator answers them all
+REQUESTS = [
+    Profile.Anon_96(), Profile.Anon_28(), Profile.Active(Profile.MODE_READ), Profile.Anon_29(),
+    Profile.EffectSettings(0x00, Profile.MODE_READ), Profile.EffectSettings(0x05, Profile.MODE_READ),
+    Profile.ApplyActive(Profile.MODE_READ), Profile.BreathPage(0, 0, Profile.MODE_READ),
+    Profile.MorsePage(0, Profile.MODE_READ), Profile.MirageFrequencies(),
+    Packet.Control.Anon_00(), Packet.Control.EffectDetails(), Packet.Control.EffectName(0),
+    Packet.Firmware.Query(), Packet.Firmware.Anon_01(), Packet.Firmware.Anon_22(),
+]
+
+
+def responses() -> list:
+    emulator = Emulator()
+    # The resolution cannot be read, its frame is taken from the emulated cache
+    return [emulator.handle(bytes(request)) for request in REQUESTS] + [emulator._load(IDX_RESOLUTION)]
+
+
+FRAMES = responses()
+
+
+def blank(frame: bytes) -> Raw:
+    """A packet of the class decoding the frame, with its header set."""
+    cls = lookup(frame)
+    packet = cls.__new__(cls)
+    Raw.__init__(packet, frame[0], frame[1], frame[2], frame[3])
+    return packet
+
+
+def fields(packet) -> list:
+    """The encoded value of every field, RGB and Resolution do not compare equal."""
+    return [field.type.encode(getattr(packet, field.name)) for field in packet.layout.fields]
+
+
+def encode(encoder, packet) -> bytes:
+    target = bytearray(64)
+    encoder(packet, memoryview(target))
+    return bytes(target)
+
+
+def test_every_layout_is_covered():
+    layouts = {cls for cls in load().values() if cls.layout is not None}
+    assert {lookup(frame) for frame in FRAMES} == layouts
+
+
+@pytest.mark.parametrize('frame', FRAMES, ids=lambda frame: lookup(frame).__name__)
+@pytest.mark.parametrize('decoder', (decode_strict, decode_fast, decode_lazy))
+@pytest.mark.parametrize('encoder', (encode_strict, encode_fast))
+def test_round_trip(frame, decoder, encoder):
+    packet = decoder(blank(frame), frame)
+
+    assert type(packet) is lookup(frame)
+    assert encode(encoder, packet) == frame
+
+
+@pytest.mark.parametrize('frame', FRAMES, ids=lambda frame: lookup(frame).__name__)
+def test_modes_decode_the_same_fields(frame):
+    strict = decode_strict(blank(frame), frame)
+    for decoder in (decode_fast, decode_lazy):
+        packet = decoder(blank(frame), frame)
+        assert fields(packet) == fields(strict)
+
+
+@pytest.mark.parametrize('request_', REQUESTS, ids=lambda request: type(request).__name__)
+def test_requests_encode_the_same(request_):
+    assert encode(encode_fast, request_) == encode(encode_strict, request_) == bytes(request_)
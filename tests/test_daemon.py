@@ -0,0 +1,25 @@
+import os
+import stat
+import pytest
+from daemon import Daemon
+from emulator import EmulatedDriver
+
+
+def test_socket_is_private(tmp_path):
+    path = str(tmp_path / 'plasma.sock')
+    with Daemon(EmulatedDriver(), path):
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert not os.path.exists(path)
+
+
+def test_failed_attach_removes_the_socket(tmp_path):
+    path = str(tmp_path / 'plasma.sock')
+    driver = EmulatedDriver()
+
+    def attach():
+        raise RuntimeError("Failed to find device")
+    driver.attach = attach
+
+    with pytest.raises(RuntimeError):
+        Daemon(driver, path)
+    assert not os.path.exists(path)
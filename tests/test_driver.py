@@ -0,0 +1,63 @@
+import pytest
+from emulator import EmulatedDriver, EFFECT_NAMES
+from packet import Packet
+from packet.raw import ErrorResponse
+
+
+@pytest.mark.parametrize('strict', (True, False))
+def test_post_many_sends_the_whole_batch_before_decoding(strict):
+    driver = EmulatedDriver(strict=strict)
+    driver.attach()
+    events = []
+    handle = driver.emulator.handle
+    driver.emulator.handle = lambda request: events.append('write') or handle(request)
+    decode = driver.decode
+    driver.decode = lambda packet, data: events.append('decode') or decode(packet, data)
+
+    requests = [Packet.Control.EffectName(i) for i in range(len(EFFECT_NAMES))]
+    responses = driver.post_many(requests)
+
+    assert events == ['write'] * len(requests) + ['decode'] * len(requests)
+    assert [response.name for response in responses] == list(EFFECT_NAMES)
+
+
+def test_post_many_grows_its_buffers():
+    driver = EmulatedDriver()
+    driver.attach()
+
+    assert len(driver.post_many([Packet.Firmware.Version()] * 40)) == 40
+    assert len(driver.outgoing) == 40 * 64 and len(driver.incoming) == 40
+    assert driver.post(Packet.Firmware.Version()).versionStr == 'V1.01.00'
+
+
+@pytest.mark.parametrize('strict', (True, False))
+def test_error_frames_are_returned_in_place(strict):
+    driver = EmulatedDriver(strict=strict)
+    driver.attach()
+
+    responses = driver.post_many([Packet.Control.EffectName(0), Packet.Control.EffectName(0x40),
+                                  Packet.Control.EffectName(1)])
+
+    assert [type(response) for response in responses] == [Packet.Control.EffectName, ErrorResponse,
+                                                           Packet.Control.EffectName]
+    assert (responses[1].prev_operation, responses[1].prev_index) == (0x21, 0x40)
+    assert responses[2].name == EFFECT_NAMES[1]
+
+
+def test_responses_which_fail_to_validate_are_error_responses():
+    driver = EmulatedDriver(strict=True)
+    driver.attach()
+    driver.emulator.handle = lambda request: bytes((0x52, 0x29, 0x00, 0x00, 0x01)) + bytes(59)
+
+    response = driver.post(Packet.Profile.Anon_29())
+
+    assert isinstance(response, ErrorResponse)
+    assert response.error is not None
+
+
+def test_rejects_anything_but_packets():
+    driver = EmulatedDriver()
+    driver.attach()
+
+    with pytest.raises(AssertionError):
+        driver.post_many([bytes(Packet.Firmware.Version())])
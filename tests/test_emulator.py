@@ -0,0 +1,75 @@
+import pytest
+import usb.core
+from emulator import Emulator
+from packet import Packet
+from packet.types import RGB
+from state import IDX_RESOLUTION
+
+
+def test_written_settings_are_read_back():
+    emulator = Emulator()
+    settings = Packet.Profile.EffectSettings(0x00)
+    settings.update(emulator.handle(bytes(Packet.Profile.EffectSettings(0x00, Packet.Profile.MODE_READ))))
+    settings.setMode(Packet.Profile.MODE_WRITE)
+    settings.setRGB(1, RGB(0x12, 0x34, 0x56))
+
+    request = bytes(settings)
+    assert emulator.handle(request) == request
+
+    response = emulator.handle(bytes(Packet.Profile.EffectSettings(0x00, Packet.Profile.MODE_READ)))
+    assert response[0] == Packet.Profile.MODE_READ
+    assert response[1:] == request[1:]
+
+
+def test_invalid_writes_are_rejected_and_not_stored():
+    emulator = Emulator()
+    read = bytes(Packet.Profile.ApplyActive(Packet.Profile.MODE_READ))
+    before = emulator.handle(read)
+
+    request = bytearray(before)
+    request[0] = Packet.Profile.MODE_WRITE
+    request[5] = 0x04
+    response = emulator.handle(bytes(request))
+
+    assert response[:2] == b'\xFF\xAA' and response[4:8] == request[:4]
+    assert emulator.errors == 1
+    assert emulator.handle(read) == before
+
+
+def test_unknown_and_write_only_packets_are_errors():
+    emulator = Emulator()
+
+    assert emulator.handle(bytes(Packet.Control.EffectName(0x40)))[:2] == b'\xFF\xAA'
+    assert emulator.handle(bytes(Packet.Profile.MirageResolution(Packet.Profile.MODE_READ)))[:2] == b'\xFF\xAA'
+    assert emulator.handle(bytes((0x30, 0x00)) + bytes(62))[:2] == b'\xFF\xAA'
+
+    resolution = emulator._load(IDX_RESOLUTION)
+    resolution = bytes((Packet.Profile.MODE_WRITE,)) + resolution[1:]
+    assert emulator.handle(resolution) == resolution
+    assert emulator.errors == 3
+
+
+def test_breath_pages_are_kept_per_index_and_zone():
+    emulator = Emulator()
+    page = Packet.Profile.BreathPage(1, 1)
+    page.setData(bytes(range(60)))
+
+    emulator.handle(bytes(page))
+
+    assert emulator.handle(bytes(Packet.Profile.BreathPage(1, 1, Packet.Profile.MODE_READ)))[4:] == bytes(range(60))
+    assert emulator.handle(bytes(Packet.Profile.BreathPage(1, 0, Packet.Profile.MODE_READ)))[4:] == bytes(60)
+
+
+def test_endpoints_queue_responses_in_order():
+    emulator = Emulator()
+
+    assert emulator.write(bytes(Packet.Firmware.Version())) == 64
+    assert emulator.write(bytes(10)) == 10
+    first = emulator.read(64)
+    second = emulator.read(64)
+
+    assert Packet.Firmware.Version().update(first.tobytes()).versionStr == 'V1.01.00'
+    assert second[:2].tobytes() == b'\xFF\xAA'
+    assert (emulator.transfers, emulator.errors) == (2, 1)
+    with pytest.raises(usb.core.USBTimeoutError):
+        emulator.read(64)
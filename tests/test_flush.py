@@ -0,0 +1,52 @@
+from emulator import EmulatedDriver
+from packet import Packet
+from packet.types import RGB
+from state import ZONE_ID_LOGO
+
+
+def test_pending_is_empty_after_a_no_op_change():
+    driver = EmulatedDriver()
+    driver.attach()
+    settings = driver.state.getSettings(ZONE_ID_LOGO)
+    settings.setRGB(1, settings.getRGB(1))
+
+    assert settings.dirty
+    assert driver.pending([settings]) == []
+    assert not settings.dirty
+
+
+def test_only_changed_packets_are_flushed():
+    driver = EmulatedDriver()
+    driver.attach()
+    clean = driver.state.getSettings(0x00)
+    changed = driver.state.getSettings(ZONE_ID_LOGO)
+    changed.setRGB(1, RGB(0x01, 0x02, 0x03))
+    transfers = driver.emulator.transfers
+
+    assert driver.flush([clean, changed]) == [changed]
+    assert changed.mode == Packet.Profile.MODE_WRITE and not changed.dirty
+    assert driver.emulator.transfers == transfers + 1
+
+    changed.setRGB(1, RGB(0x01, 0x02, 0x03))
+    assert driver.flush([clean, changed]) == []
+    assert driver.emulator.transfers == transfers + 1
+
+
+def test_rejected_packets_stay_dirty():
+    driver = EmulatedDriver()
+    driver.attach()
+    active = driver.state.getActiveZones()
+    active.count = 0x04
+    active.dirty = True
+
+    assert driver.flush([active]) == [active]
+    assert active.dirty
+
+
+def test_every_dirty_packet_is_pending_without_a_cache():
+    driver = EmulatedDriver(cache=False)
+    driver.attach()
+    settings = driver.post(Packet.Profile.EffectSettings(ZONE_ID_LOGO, Packet.Profile.MODE_READ))
+    settings.setRGB(1, settings.getRGB(1))
+
+    assert driver.pending([settings]) == [settings]
@@ -0,0 +1,49 @@
+from emulator import EmulatedDriver
+from instrument import Instruments, STAGES
+from packet import Packet
+
+
+def test_every_stage_is_timed_per_packet():
+    driver = EmulatedDriver()
+    driver.attach()
+    driver.instrument(Instruments())
+    spans = []
+    driver.instruments.addHook(lambda stage, request, operation, start, end, data:
+                               spans.append((stage, type(request).__name__, operation, end - start)))
+
+    driver.post_many([Packet.Profile.Anon_96(), Packet.Control.Active()])
+
+    assert [span[:3] for span in spans] == [
+        ('encode', 'Anon_96', 0x96), ('encode', 'Active', 0x80),
+        ('write', 'Anon_96', 0x96), ('read', 'Anon_96', 0x96),
+        ('write', 'Active', 0x80), ('read', 'Active', 0x80),
+        ('collect', 'Anon_96', 0x96), ('collect', 'Active', 0x80),
+        ('decode', 'Anon_96', 0x96), ('decode', 'Active', 0x80),
+    ]
+    assert all(span[3] >= 0 for span in spans)
+
+    stats = driver.stats()['classes']['Anon_96']
+    assert stats['packets'] == 1
+    assert all(stats['stages'][stage]['count'] == 1 for stage in STAGES)
+
+
+def test_raw_frames_have_no_encode_or_decode_stage():
+    driver = EmulatedDriver()
+    driver.attach()
+    driver.instrument(Instruments())
+    stages = []
+    driver.instruments.addHook(lambda stage, request, *_: stages.append((stage, request)))
+
+    driver.transfer([bytes(Packet.Profile.Anon_96())])
+
+    assert stages == [('write', None), ('read', None), ('collect', None)]
+
+
+def test_removing_the_instruments_restores_the_plain_transport():
+    driver = EmulatedDriver()
+    driver.attach()
+    driver.instrument(Instruments())
+    driver.instrument(None)
+
+    assert not [name for name in vars(driver) if name.endswith('Frame')]
+    assert driver.post(Packet.Profile.Anon_96()).displayName() == 'Packet.Profile.Anon_96'
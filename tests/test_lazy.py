@@ -0,0 +1,68 @@
+import copy
+from emulator import EmulatedDriver
+from packet import Packet
+from packet.layout import UNSET
+from packet.types import RGB
+from state import IDX_ZONE_LOGO, ZONE_ID_LOGO
+
+
+def logo(driver) -> bytes:
+    return driver.state.load(IDX_ZONE_LOGO)
+
+
+def test_fields_are_decoded_on_first_access():
+    driver = EmulatedDriver()
+    driver.attach()
+    settings = Packet.Profile.EffectSettings(ZONE_ID_LOGO, Packet.Profile.MODE_READ).load(logo(driver))
+
+    assert settings.values == [UNSET] * len(settings.layout.fields)
+    assert settings.p3 == 0x01
+    assert settings.values.count(UNSET) == len(settings.layout.fields) - 1
+
+
+def test_set_fields_shadow_the_raw_data():
+    driver = EmulatedDriver()
+    driver.attach()
+    frame = logo(driver)
+    settings = Packet.Profile.EffectSettings(ZONE_ID_LOGO, Packet.Profile.MODE_READ).load(frame)
+    settings.setRGB(1, RGB(0x01, 0x02, 0x03))
+
+    encoded = bytes(settings)
+    assert encoded[10:13] == b'\x01\x02\x03'
+    assert encoded[:10] == frame[:10] and encoded[13:] == frame[13:]
+
+
+def test_load_drops_the_values_of_a_previous_frame():
+    driver = EmulatedDriver()
+    driver.attach()
+    settings = driver.state.getSettings(0x00)
+    settings.setRGB(1, RGB(0x01, 0x02, 0x03))
+
+    settings.load(driver.state.load(0))
+
+    assert bytes(settings.getRGB(1)) == driver.state.load(0)[10:13]
+
+
+def test_copies_decode_the_same_fields():
+    driver = EmulatedDriver()
+    driver.attach()
+    settings = driver.state.getSettings(ZONE_ID_LOGO)
+    assert settings.id == ZONE_ID_LOGO
+
+    copied = copy.deepcopy(settings)
+
+    assert copied.values[0] == ZONE_ID_LOGO and copied.values[1] is UNSET
+    assert bytes(copied) == bytes(settings)
+
+
+def test_lazy_driver_keeps_the_responses():
+    driver = EmulatedDriver(strict=False, lazy=True)
+    driver.attach()
+
+    settings = driver.post(Packet.Profile.EffectSettings(ZONE_ID_LOGO, Packet.Profile.MODE_READ))
+    version = driver.post(Packet.Firmware.Version())
+
+    assert settings.raw == logo(driver)
+    assert bytes(settings.getRGB(1)) == b'\x00\xFF\x00'
+    # Packets without a layout are decoded right away
+    assert version.versionStr == 'V1.01.00'
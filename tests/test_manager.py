@@ -0,0 +1,33 @@
+import pytest
+from emulator import Emulator, EmulatedDriver
+from manager import DeviceManager
+
+
+class FailingEmulator(Emulator):
+    """Answers nothing, so filling the state cache fails once the device is claimed."""
+
+    def read(self, size_or_buffer, timeout: int = None):
+        raise IOError("Device gone")
+
+
+def test_attach_releases_every_device_when_one_fails():
+    drivers = [EmulatedDriver(), EmulatedDriver(FailingEmulator()), EmulatedDriver()]
+    manager = DeviceManager()
+    for driver in drivers:
+        manager.add(driver)
+
+    with pytest.raises(IOError):
+        manager.attach()
+
+    assert [driver.device for driver in drivers] == [None, None, None]
+    assert len(manager) == 0
+
+
+def test_attach_and_detach():
+    manager = DeviceManager()
+    drivers = [manager.add(EmulatedDriver()) for _ in range(2)]
+
+    assert manager.attach() == 2
+    assert all(driver.device is not None for driver in drivers)
+    manager.detach()
+    assert all(driver.device is None for driver in drivers)
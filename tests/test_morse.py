@@ -0,0 +1,64 @@
+import pytest
+from effects import Morse
+
+Encoder = Morse.Encoder
+
+MESSAGES = ('SOS', 'hello world', 'The quick brown fox, 1234567890?', '')
+LONG = 'paris ' * 40
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+def test_pack_matches_the_text_encoding(message):
+    code = Encoder.encode(message, Encoder.SIZE)
+
+    assert Encoder.pack(message) == Encoder.to_bytes(code).ljust(Encoder.SIZE, b'\0')
+
+
+@pytest.mark.parametrize('message', MESSAGES)
+def test_pack_round_trips(message):
+    data = Encoder.pack(message)
+    code = Encoder.from_bytes(data)
+
+    assert len(data) == Encoder.SIZE
+    assert code == Encoder.encode(message, Encoder.SIZE)
+    assert Encoder.decode(code) == message.lower() + ' '
+
+
+def test_pack_truncates_to_the_whole_characters_which_fit():
+    data = Encoder.pack(LONG)
+    decoded = Encoder.decode(Encoder.from_bytes(data))
+
+    assert LONG.startswith(decoded.rstrip())
+    assert 0 < len(decoded.rstrip()) < len(LONG.rstrip())
+    # 'pari' takes 30 bits, leaving just enough for the end marker
+    assert Encoder.pack(LONG, 4) == Encoder.pack('pari', 4)
+
+
+def test_pack_skips_unknown_characters():
+    assert Encoder.pack('s~o#s') == Encoder.pack('sos')
+
+
+def test_a_short_message_fits_one_page():
+    [page] = Encoder.pages('SOS')
+
+    assert page.index == 0
+    assert page.getData() == Encoder.pack('SOS')[:Encoder.PAGE_SIZE]
+
+
+def test_a_long_message_spans_two_pages():
+    pages = Encoder.pages(LONG)
+
+    assert [page.index for page in pages] == [0, 1]
+    assert b''.join(page.getData() for page in pages) == Encoder.pack(LONG)
+
+
+@pytest.mark.parametrize('slot', (1, 2, 3))
+def test_slots_use_their_own_pages(slot):
+    assert [page.index for page in Encoder.pages('SOS', slot)] == [slot * 2]
+    assert [page.index for page in Encoder.pages(LONG, slot)] == [slot * 2, slot * 2 + 1]
+
+
+@pytest.mark.parametrize('slot', (0, 4))
+def test_rejects_unknown_slots(slot):
+    with pytest.raises(AssertionError):
+        Encoder.pages('SOS', slot)
@@ -0,0 +1,51 @@
+import pytest
+from emulator import Emulator
+from packet import Packet
+from packet.raw import Raw, ErrorResponse
+from packet.registry import CLASSES, decode_frame, load
+
+
+@pytest.mark.parametrize('key', sorted(load()), ids=lambda key: '%02X_%02X' % key)
+def test_frames_decode_into_their_registered_class(key):
+    frame = bytes(key) + bytes(62)
+
+    assert type(decode_frame(frame, lazy=True)) is CLASSES[key]
+
+
+def test_responses_decode_like_their_requests():
+    emulator = Emulator()
+    for request in (Packet.Firmware.Anon_22(), Packet.Control.EffectName(2),
+                    Packet.Profile.EffectSettings(0x0B, Packet.Profile.MODE_READ)):
+        response = emulator.handle(bytes(request))
+        for lazy in (False, True):
+            packet = decode_frame(response, lazy)
+            assert type(packet) is type(request)
+            assert bytes(packet) == response
+
+    assert decode_frame(emulator.handle(bytes(Packet.Firmware.Version()))).versionStr == 'V1.01.00'
+
+
+def test_unknown_frames_are_raw_dwords():
+    frame = bytes((0x30, 0x01, 0x02, 0x03)) + bytes(range(60))
+
+    packet = decode_frame(frame)
+
+    assert type(packet) is Raw
+    assert (packet.mode, packet.operation, packet.index, packet.flags) == (0x30, 0x01, 0x02, 0x03)
+    assert packet.dwords[0] == 0x03020100
+
+
+def test_error_frames_are_error_responses():
+    frame = Emulator()._error(bytes(Packet.Control.EffectName(0x40)))
+
+    for lazy in (False, True):
+        response = decode_frame(frame, lazy)
+        assert type(response) is ErrorResponse
+        assert (response.prev_operation, response.prev_index) == (0x21, 0x40)
+
+
+def test_invalid_frames_only_fail_unless_lazy():
+    frame = bytes((0x52, 0x29, 0x00, 0x00, 0x01)) + bytes(59)
+
+    assert isinstance(decode_frame(frame), ErrorResponse)
+    assert decode_frame(frame, lazy=True).unknown_01 == 0x0001
@@ -0,0 +1,80 @@
+import pytest
+from emulator import EmulatedDriver
+from packet import Packet
+from packet.types import RGB
+from state import IDX_RESOLUTION, TOTAL_PACKETS, ZONE_ID_LOGO
+
+
+def test_fill_caches_every_readable_packet():
+    driver = EmulatedDriver()
+    driver.attach()
+    state = driver.state
+
+    assert state.valid == [index != IDX_RESOLUTION for index in range(TOTAL_PACKETS)]
+    for index in range(TOTAL_PACKETS):
+        if index != IDX_RESOLUTION:
+            assert state.load(index) == driver.emulator._load(index)
+    with pytest.raises(KeyError):
+        state.load(IDX_RESOLUTION)
+
+
+def test_reads_never_reach_the_device():
+    driver = EmulatedDriver()
+    driver.attach()
+    transfers = driver.emulator.transfers
+
+    driver.state.getRing()
+    driver.state.getLogo()
+    driver.state.getFan()
+    driver.state.getMorsePage(3)
+
+    assert driver.emulator.transfers == transfers
+
+
+def test_writes_update_the_cache():
+    driver = EmulatedDriver()
+    driver.attach()
+    settings = driver.state.getSettings(ZONE_ID_LOGO)
+    settings.setMode(Packet.Profile.MODE_WRITE)
+    settings.setRGB(1, RGB(0x01, 0x02, 0x03))
+
+    driver.post(settings)
+
+    cached = driver.state.getSettings(ZONE_ID_LOGO)
+    assert cached.mode == Packet.Profile.MODE_READ
+    assert bytes(cached.getRGB(1)) == b'\x01\x02\x03'
+    assert not driver.state.differs(bytes(settings))
+
+
+def test_error_responses_leave_the_cache_untouched():
+    driver = EmulatedDriver()
+    driver.attach()
+    active = driver.state.getActiveZones()
+    before = bytes(active)
+    active.setMode(Packet.Profile.MODE_WRITE)
+    active.count = 0x04
+
+    driver.post(active)
+
+    assert bytes(driver.state.getActiveZones()) == before
+
+
+def test_the_resolution_is_cached_once_written():
+    driver = EmulatedDriver()
+    driver.attach()
+    assert driver.state.getFan().mirage is None
+
+    resolution = Packet.Profile.MirageResolution(Packet.Profile.MODE_READ).update(driver.emulator._load(IDX_RESOLUTION))
+    resolution.setMode(Packet.Profile.MODE_WRITE)
+    driver.post(resolution)
+
+    assert driver.state.valid[IDX_RESOLUTION]
+    assert driver.state.getFan().mirage.getProfileFrequencies(0) == (45, 500, 2000)
+
+
+def test_no_state_without_a_cache():
+    driver = EmulatedDriver(cache=False)
+    driver.attach()
+
+    assert driver.state is None
+    assert driver.emulator.transfers == 0
@@ -0,0 +1,104 @@
+import pytest
+from effects import Morse, Static
+from emulator import EmulatedDriver
+from packet import Packet
+from packet.types import RGB
+from state import ZONE_ID_LOGO
+from zone import Ring
+
+
+def record(driver) -> list:
+    """Collects the (mode, operation) of every packet the emulator receives."""
+    sent = []
+    handle = driver.emulator.handle
+
+    def recorder(request: bytes) -> bytes:
+        sent.append((request[0], request[1]))
+        return handle(request)
+
+    driver.emulator.handle = recorder
+    return sent
+
+
+def test_sequence_follows_the_vendor_order():
+    driver = EmulatedDriver()
+    driver.attach()
+    sent = record(driver)
+
+    ring = Ring(Morse(driver.state.getSettings(0x0B)))
+    ring.effect.setColor(RGB(0x04, 0x05, 0x06))
+    logo = driver.state.getLogo()
+    logo.effect.setColor(RGB(0x01, 0x02, 0x03))
+    # A raw ApplyActive is merged with the one closing the sequence
+    active = driver.state.getActiveZones()
+    active.setRingEffect(0x0B)
+
+    with driver.transaction() as transaction:
+        transaction.add(active, ring, *Morse.Encoder.pages('SOS'), logo)
+
+    assert sent == [
+        (0x41, 0x80), (0x51, 0x96), (0x51, 0x28),
+        (0x51, 0x2C),   # logo
+        (0x51, 0x73),   # morse page
+        (0x51, 0x2C),   # ring
+        (0x51, 0xA0), (0x51, 0x28),
+    ]
+    assert transaction.sent[3].getId() == ZONE_ID_LOGO
+    assert transaction.sent[5].getId() == 0x0B
+
+
+def test_unchanged_apply_active_sends_nothing():
+    driver = EmulatedDriver()
+    driver.attach()
+    sent = record(driver)
+
+    ring = driver.state.getRing()
+    with driver.transaction() as transaction:
+        transaction.add(driver.state.getActiveZones(), ring)
+
+    assert sent == []
+
+
+def test_rejects_control_packets():
+    driver = EmulatedDriver()
+    driver.attach()
+
+    with pytest.raises(TypeError):
+        driver.transaction().add(Packet.Control.Active())
+
+
+def test_ring_effect_sets_active_zones_once():
+    driver = EmulatedDriver()
+    driver.attach()
+    sent = record(driver)
+
+    with driver.transaction() as transaction:
+        transaction.add(Ring(Static(driver.state.getSettings(0x00))))
+
+    assert sent.count((0x51, 0xA0)) == 1
+    assert sent[-2:] == [(0x51, 0xA0), (0x51, 0x28)]
+
+
+def test_active_zones_read_without_a_cache():
+    driver = EmulatedDriver(cache=False)
+    driver.attach()
+    sent = record(driver)
+
+    with driver.transaction() as transaction:
+        transaction.add(Ring(Static(driver.post(Packet.Profile.EffectSettings(0x00, Packet.Profile.MODE_READ)))))
+
+    assert sent[0] == (0x52, 0x2C)
+    assert (0x52, 0xA0) in sent
+    assert sent[-2:] == [(0x51, 0xA0), (0x51, 0x28)]
+
+
+def test_failed_active_zones_read_raises():
+    driver = EmulatedDriver(cache=False)
+    driver.attach()
+    handle = driver.emulator.handle
+    driver.emulator.handle = lambda request: driver.emulator._error(request) if request[1] == 0xA0 else handle(request)
+
+    ring = Ring(Static(driver.post(Packet.Profile.EffectSettings(0x00, Packet.Profile.MODE_READ))))
+    with pytest.raises(IOError):
+        with driver.transaction() as transaction:
+            transaction.add(ring)
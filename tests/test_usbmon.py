@@ -0,0 +1,68 @@
+import struct
+from emulator import Emulator
+from packet import Packet
+from usbmon import Importer, XFER_CONTROL, XFER_INTERRUPT
+
+BUS = 1
+COOLER = 5
+OTHER = 3
+
+DEVICE_DESCRIPTOR = bytes((18, 0x01, 0x00, 0x02, 0, 0, 0, 64)) + struct.pack('<HH', 0x2516, 0x0051) + bytes(6)
+# Interface 0 with endpoint 0x81, interface 1 (the cooler) with 0x02 out and 0x83 in
+CONFIGURATION_DESCRIPTOR = (bytes((9, 0x02, 59, 0, 2, 1, 0, 0xA0, 50)) +
+                            bytes((9, 0x04, 0, 0, 1, 3, 0, 0, 0)) + bytes((7, 0x05, 0x81, 3, 64, 0, 1)) +
+                            bytes((9, 0x04, 1, 0, 2, 3, 0, 0, 0)) + bytes((7, 0x05, 0x02, 3, 64, 0, 1)) +
+                            bytes((7, 0x05, 0x83, 3, 64, 0, 1)))
+
+
+def pcap(path, events) -> None:
+    """Writes (event, transfer type, endpoint, device, data) tuples as a LINKTYPE_USB_LINUX capture."""
+    with open(path, 'wb') as file:
+        file.write(b'\xd4\xc3\xb2\xa1' + struct.pack('<HHiIII', 2, 4, 0, 0, 65535, 189))
+        for (i, (event, kind, endpoint, device, data)) in enumerate(events):
+            header = struct.pack('<QBBBBHbbqiiII', i, ord(event), kind, endpoint, device, BUS, 0, 0, 0, 0, 0,
+                                 len(data), len(data)) + bytes(8)
+            file.write(struct.pack('<IIII', i, 0, len(header) + len(data), len(header) + len(data)))
+            file.write(header + data)
+
+
+def enumeration() -> list:
+    return [
+        ('C', XFER_CONTROL, 0x80, COOLER, DEVICE_DESCRIPTOR),
+        ('C', XFER_CONTROL, 0x80, COOLER, CONFIGURATION_DESCRIPTOR[:9]),
+        ('C', XFER_CONTROL, 0x80, COOLER, CONFIGURATION_DESCRIPTOR),
+    ]
+
+
+def test_decodes_a_captured_read_request_and_response(tmp_path):
+    request = bytes(Packet.Firmware.Version())
+    response = Emulator().handle(request)
+    pcap(tmp_path / 'version.pcap', enumeration() + [
+        ('S', XFER_INTERRUPT, 0x02, COOLER, request),
+        ('C', XFER_INTERRUPT, 0x83, COOLER, response),
+    ])
+
+    [(_, sent, received)] = list(Importer(str(tmp_path / 'version.pcap')).packets())
+
+    assert sent.displayName() == 'Packet.Firmware.Version'
+    assert bytes(sent.dwords[0]) == request[4:8]
+    assert received.displayName() == 'Packet.Firmware.Version'
+    assert received.versionStr == 'V1.01.00'
+
+
+def test_skips_other_devices_and_interfaces(tmp_path):
+    request = bytes(Packet.Profile.Anon_96())
+    frame = bytes((0x50, 0xEE)) + bytes(62)
+    pcap(tmp_path / 'bus.pcap', [('S', XFER_INTERRUPT, 0x01, OTHER, frame)] + enumeration() + [
+        ('S', XFER_INTERRUPT, 0x01, OTHER, frame),
+        ('C', XFER_INTERRUPT, 0x81, COOLER, frame),
+        ('S', XFER_INTERRUPT, 0x02, COOLER, request),
+    ])
+
+    importer = Importer(str(tmp_path / 'bus.pcap'))
+    frames = [data for (_, _, data) in importer.frames()]
+
+    assert frames == [request]
+    assert importer.address == (BUS, COOLER)
+    assert importer.endpoints == (0x02, 0x83)
+    assert importer.unknown == 1
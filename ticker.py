@@ -0,0 +1,200 @@
+import argparse
+import sys
+import time
+from effects import Morse
+from packet import Packet
+from zone import Ring
+
+
+VENDOR_ID = 0x2516
+PRODUCT_ID = 0x0051
+
+EFFECT_ID_MORSE = 0x0B
+
+# The length of each symbol in time units: a dot or dash and the gap following it, or a space
+# NOTE These follow the usual morse ratios, the timing of the device is yet to be measured
+DURATIONS = {'.': 2, '-': 4, ' ': 2}
+# The default time unit, in seconds
+UNIT = 0.15
+# How long before the end of a chunk the next one is written, in seconds
+LEAD = 0.05
+
+
+def duration(code: str, unit: float = UNIT) -> float:
+    """The time, in seconds, taken to play the dots, dashes and spaces of a code once."""
+    return unit * sum(code.count(symbol) * length for (symbol, length) in DURATIONS.items())
+
+
+def chunks(texts, size: int = Morse.Encoder.SIZE):
+    """Splits a stream of text into chunks filling the morse pages.
+
+       Words are packed greedily, each chunk holding as many whole words as
+       encode into 'size' bytes, so the pages are rewritten as rarely as
+       possible. Words too long for the pages on their own are truncated.
+
+    Parameters
+    ----------
+    texts : iterable
+        The strings to display, read as needed.
+    size : int
+        The number of bytes available to the code.
+
+    Yields
+    ------
+    str
+        The words of each chunk, each followed by a space.
+
+    """
+
+    codes = Morse.Encoder.CODES
+    space = codes[' '][1]
+    limit = size * 8 - 2
+    words = []
+    bits = 0
+    for text in texts:
+        for word in text.split():
+            cost = sum(codes[char][1] for char in word if char in codes) + space
+            if cost == space:
+                continue
+            if words and bits + cost > limit:
+                yield ' '.join(words) + ' '
+                words = []
+                bits = 0
+            words.append(word)
+            bits += cost
+
+    if words:
+        yield ' '.join(words) + ' '
+
+
+class Ticker:
+    """Streams text through the two active morse pages of the ring.
+
+       The ring is switched to the morse effect, repeating, so a chunk keeps
+       playing until the next one is ready. Each chunk is written just
+       before its predecessor finishes playing once, its play time is
+       estimated from its dots, dashes and spaces (see DURATIONS).
+
+       Page writes are kept to a minimum: chunks are filled greedily, a
+       chunk ending within the first page only writes that page, and pages
+       whose bytes are unchanged are not written at all (see
+       Driver.pending()).
+
+    Parameters
+    ----------
+    driver : Driver
+        The (attached) driver, with a state cache.
+    unit : float
+        The time unit of DURATIONS, in seconds.
+    lead : float
+        How early the next chunk is written, in seconds.
+    clock : callable
+        The monotonic clock, in seconds.
+    sleep : callable
+        Waits for the given number of seconds.
+
+    """
+
+    def __init__(self, driver, unit: float = UNIT, lead: float = LEAD, clock=time.monotonic, sleep=time.sleep):
+        self.driver = driver
+        self.unit = unit
+        self.lead = lead
+        self.clock = clock
+        self.sleep = sleep
+        self.ring = None
+        self.running = False
+
+        self.chunks = 0
+        self.written = 0
+        self.late = 0
+
+    def start(self) -> None:
+        """Switches the ring to the repeating morse effect."""
+        self.ring = Ring(Morse(self.driver.state.getSettings(EFFECT_ID_MORSE)))
+        self.ring.effect.setRepeat(True)
+
+    def stop(self) -> None:
+        """Stops run() before the next chunk, may be called from another thread."""
+        self.running = False
+
+    def show(self, text: str) -> float:
+        """Writes a chunk to the active pages, returns how long it takes to play.
+
+           The ring effect is committed along with the pages, only when it
+           changed.
+        """
+        if self.ring is None:
+            self.start()
+
+        pages = Morse.Encoder.pages(text)
+        with self.driver.transaction() as transaction:
+            transaction.add(self.ring, *pages)
+        self.written += sum(1 for packet in transaction.sent if isinstance(packet, Packet.Profile.MorsePage))
+        self.chunks += 1
+
+        return duration(Morse.Encoder.from_bytes(b''.join(page.data for page in pages)), self.unit)
+
+    def run(self, texts) -> dict:
+        """Displays a stream of text, until it ends or stop() is called.
+
+        Returns
+        -------
+        dict
+            The number of chunks shown, of pages written, and of chunks
+            written after their predecessor had finished.
+
+        """
+
+        self.running = True
+        deadline = None
+        for chunk in chunks(texts):
+            if not self.running:
+                break
+
+            if deadline is not None:
+                delay = deadline - self.clock()
+                if delay > 0:
+                    self.sleep(delay)
+                elif delay < -self.lead:
+                    self.late += 1
+
+            played = self.show(chunk)
+            deadline = self.clock() + played - self.lead
+
+        # Let the last chunk play out before returning
+        if self.running and deadline is not None:
+            delay = deadline + self.lead - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+
+        self.running = False
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {'chunks': self.chunks, 'pages': self.written, 'late': self.late}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Displays text read from stdin as morse code on the ring.')
+    parser.add_argument('--unit', type=float, default=UNIT, help='The time unit, in seconds.')
+    parser.add_argument('--emulate', action='store_true', help='Display on an emulated device.')
+    args = parser.parse_args()
+
+    if args.emulate:
+        from emulator import EmulatedDriver
+        driver = EmulatedDriver()
+    else:
+        from driver import Driver
+        driver = Driver(VENDOR_ID, PRODUCT_ID)
+
+    driver.attach()
+    try:
+        stats = Ticker(driver, args.unit).run(sys.stdin)
+    finally:
+        driver.detach()
+
+    print("%d chunks, %d pages written, %d late" % (stats['chunks'], stats['pages'], stats['late']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+from packet import Packet
+from packet.raw import ErrorResponse
+from packet.profile import Base as ProfilePacket
+from effects import Effect, Mirage, Off
+from zone import Zone, Ring, Fan
+from state import ZONE_ID_LOGO, ZONE_ID_FAN
+
+
+class Transaction:
+    """Coalesces changes to zones and effects into a single commit.
+
+       Zones, effects, mirage settings or raw profile packets are added to
+       the transaction and may be modified until it exits. The changed
+       packets are then written in the order used by the vendor software,
+       framed by a single apply:
+
+           0x41 0x80, 0x51 0x96, 0x51 0x28
+           mirage (0x71, 0x94), other profile packets (e.g. breath pages),
+           fan, logo, morse pages (0x73), ring effect
+           0x51 0xA0 (active zones), 0x51 0x28
+           0x41 0x03 (only when storing)
+
+       An ApplyActive added to the transaction replaces the one of the
+       state, it is only ever sent once, in its place above. Nothing is sent
+       when none of the packets changed. Leaving the block with an exception
+       discards the changes.
+
+    Parameters
+    ----------
+    driver : Driver
+        The driver to commit to.
+    store : bool
+        Whether to finish with Control.Stored.
+
+    """
+
+    def __init__(self, driver, store: bool = False):
+        self.driver = driver
+        self.store = store
+        self.items = []
+        self.sent = []
+
+    def __enter__(self) -> 'Transaction':
+        return self
+
+    def __exit__(self, type, value, traceback) -> None:
+        if type is None:
+            self.commit()
+
+    def add(self, *items) -> 'Transaction':
+        """Adds zones, effects, mirage settings or profile packets.
+
+           Items are only resolved into packets on commit, so a zone may have
+           a new effect applied after being added. Control and firmware
+           packets are rejected, they have no place in the sequence.
+        """
+        for item in items:
+            if not isinstance(item, (Zone, Effect, Mirage, Packet.Raw)):
+                raise TypeError("Cannot add %s to a transaction." % type(item).__name__)
+            if isinstance(item, Packet.Raw) and not isinstance(item, ProfilePacket):
+                raise TypeError("Cannot add %s to a transaction, only profile packets are committed." %
+                                item.displayName())
+            self.items.append(item)
+        return self
+
+    def _activeZones(self) -> Packet.Profile.ApplyActive:
+        if self.driver.state is not None:
+            return self.driver.state.getActiveZones()
+        response = self.driver.post(Packet.Profile.ApplyActive(Packet.Profile.MODE_READ))
+        if isinstance(response, ErrorResponse):
+            raise IOError("Failed to read the active zones")
+        return response
+
+    def _collect(self) -> tuple:
+        packets = []
+        ring = None
+        active = None
+
+        for item in self.items:
+            if isinstance(item, Ring):
+                ring = item.effect.getSettings().getId()
+                # The ring is switched off through the active zones alone
+                if not isinstance(item.effect, Off):
+                    packets.append(item.effect.getSettings())
+            elif isinstance(item, Zone):
+                packets.append(item.effect.getSettings())
+                if isinstance(item, Fan) and item.getMirage() is not None:
+                    packets += [item.getMirage().resolution, item.getMirage().frequencies]
+            elif isinstance(item, Effect):
+                packets.append(item.getSettings())
+            elif isinstance(item, Mirage):
+                packets += [item.resolution, item.frequencies]
+            elif isinstance(item, Packet.Profile.ApplyActive):
+                active = item
+            else:
+                packets.append(item)
+
+        return packets, ring, active
+
+    def _order(self, packet) -> int:
+        Profile = Packet.Profile
+        if isinstance(packet, (Profile.MirageResolution, Profile.MirageFrequencies)):
+            return 0
+        if isinstance(packet, Profile.EffectSettings):
+            if packet.getId() == ZONE_ID_FAN:
+                return 2
+            if packet.getId() == ZONE_ID_LOGO:
+                return 3
+            return 5
+        if isinstance(packet, Profile.MorsePage):
+            return 4
+        # Any other profile packet, see add()
+        return 1
+
+    def packets(self) -> list:
+        """Builds the sequence to send, without sending it."""
+        packets, ring, active = self._collect()
+        changed = sorted(self.driver.pending(packets), key=self._order)
+
+        if active is not None:
+            changed += self.driver.pending([active])
+        if ring is not None:
+            if active is None:
+                active = self._activeZones()
+            if active.getRingEffect() != ring:
+                active.setRingEffect(ring)
+                if active not in changed:
+                    changed.append(active)
+
+        if not changed:
+            return [Packet.Control.Stored()] if self.store else []
+
+        if active is None:
+            active = self._activeZones()
+        if active not in changed:
+            changed.append(active)
+        active.setMode(Packet.Profile.MODE_WRITE)
+
+        sequence = [
+            Packet.Control.Active(),
+            Packet.Profile.Anon_96(Packet.Profile.MODE_WRITE),
+            Packet.Profile.Anon_28()
+        ]
+        sequence += changed
+        sequence.append(Packet.Profile.Anon_28())
+        if self.store:
+            sequence.append(Packet.Control.Stored())
+
+        return sequence
+
+    def commit(self, timeout=100) -> list:
+        """Sends the changes, returns the responses."""
+        sequence = self.packets()
+        self.items = []
+        if not sequence:
+            return []
+
+        responses = self.driver.post_many(sequence, timeout)
+        for packet, response in zip(sequence, responses):
+            if not isinstance(response, ErrorResponse):
+                packet.dirty = False
+
+        self.sent = sequence
+        return responses
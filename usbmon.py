@@ -0,0 +1,342 @@
+import argparse
+import struct
+from collections import deque
+from capture import VENDOR_ID, PRODUCT_ID, DIR_OUT, DIR_IN, Recorder
+from packet.registry import decode_frame
+
+
+# Classic pcap: file header, then a header per record
+PCAP_MAGIC = {b'\xd4\xc3\xb2\xa1': ('<', 1e-6), b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+              b'\x4d\x3c\xb2\xa1': ('<', 1e-9), b'\xa1\xb2\x3c\x4d': ('>', 1e-9)}
+PCAPNG_MAGIC = b'\x0a\x0d\x0d\x0a'
+
+# The Linux usbmon link types, the header is followed by the captured data
+LINKTYPE_USB_LINUX = 189             # 48 byte header
+LINKTYPE_USB_LINUX_MMAPPED = 220     # 64 byte header
+USBMON_HEADERS = {LINKTYPE_USB_LINUX: 48, LINKTYPE_USB_LINUX_MMAPPED: 64}
+
+# id, type, transfer type, endpoint, device, bus, setup flag, data flag, seconds, microseconds, status,
+# length, captured length
+USBMON = '%sQBBBBHbbqiiII'
+
+XFER_INTERRUPT = 1
+XFER_CONTROL = 2
+
+# Descriptor types, see _find_endpoints()
+DESCRIPTOR_CONFIGURATION = 0x02
+DESCRIPTOR_INTERFACE = 0x04
+DESCRIPTOR_ENDPOINT = 0x05
+
+FRAME_SIZE = 64
+
+
+def _find_device(data) -> tuple:
+    """The (vendor, product) of a device descriptor, None for other data."""
+    if len(data) >= 12 and data[0] == 18 and data[1] == 0x01:
+        return struct.unpack_from('<HH', data, 8)
+    return None
+
+
+def _find_endpoints(data, interface: int) -> tuple:
+    """The interrupt endpoints of an interface in a configuration descriptor, None for other data."""
+    if len(data) < 9 or data[1] != DESCRIPTOR_CONFIGURATION:
+        return None
+
+    endpoints = []
+    current = None
+    offset = data[0]
+    while offset + 4 <= len(data) and data[offset] > 0:
+        kind = data[offset + 1]
+        if kind == DESCRIPTOR_INTERFACE:
+            current = (data[offset + 2], data[offset + 3])
+        elif kind == DESCRIPTOR_ENDPOINT and current == (interface, 0) and data[offset + 3] & 0x03 == 0x03:
+            endpoints.append(data[offset + 2])
+        offset += data[offset]
+    return tuple(endpoints) or None
+
+
+class Importer:
+    """Streams the frames of the cooler out of a usbmon capture.
+
+       Both the usbmon text format (/sys/kernel/debug/usb/usbmon/*u) and pcap
+       or pcapng files of the usbmon link types (as written by Wireshark or
+       tcpdump) are read, one line or record at a time. Memory use does not
+       depend on the size of the capture.
+
+       Only the 64 byte interrupt transfers of the cooler interface are
+       kept: outgoing frames are taken from their submission, incoming
+       frames from their completion. The device is identified by its bus and
+       address and the interface by its interrupt endpoints, each either
+       given or learned from the descriptors read while the device
+       enumerates. Until both are known every frame is skipped (see
+       'unknown'), a capture started after the device enumerated needs them
+       given.
+
+       NOTE The text format only shows the first 32 bytes of each transfer
+       by default, frames captured that way are incomplete and skipped (see
+       'truncated'). The configuration descriptor is cut short too, so the
+       endpoints are not learned. Raise the usbmon data limit or capture to
+       pcap instead.
+
+    Parameters
+    ----------
+    path : str
+        The capture file.
+    address : tuple
+        The (bus, device) numbers of the cooler, learned when omitted.
+    endpoints : tuple
+        The interrupt endpoint addresses of the interface, learned when
+        omitted.
+    vendorId, productId : int
+        The device to learn the address of.
+    interface : int
+        The interface to learn the endpoints of, see Driver.
+
+    """
+
+    def __init__(self, path: str, address: tuple = None, endpoints: tuple = None, vendorId: int = VENDOR_ID,
+                 productId: int = PRODUCT_ID, interface: int = 1):
+        self.path = path
+        self.address = address
+        self.endpoints = endpoints
+        self.device = (vendorId, productId)
+        self.interface = interface
+        self.truncated = 0
+        self.unknown = 0
+
+    def _accept(self, bus: int, device: int, endpoint: int) -> bool:
+        return self.address == (bus, device) and endpoint in self.endpoints
+
+    def _learn(self, bus: int, device: int, data) -> None:
+        if self.address is None:
+            if _find_device(data) == self.device:
+                self.address = (bus, device)
+        elif self.endpoints is None and self.address == (bus, device):
+            self.endpoints = _find_endpoints(data, self.interface)
+
+    def events(self):
+        """Yields (timestamp, bus, device, endpoint, type, transfer type, length, data) for every URB event."""
+        with open(self.path, 'rb') as file:
+            magic = file.read(4)
+            file.seek(0)
+            if magic in PCAP_MAGIC:
+                yield from self._pcap(file)
+            elif magic == PCAPNG_MAGIC:
+                yield from self._pcapng(file)
+            else:
+                yield from self._text(file)
+
+    def _text(self, file):
+        # tag timestamp event address status length [tag data...]
+        # ffff8800b84f6d80 3575914555 S Io:3:002:1 -115:8 64 = 41030000 00000000 ...
+        kinds = {'I': XFER_INTERRUPT, 'C': XFER_CONTROL}
+        for line in file:
+            words = line.split()
+            if len(words) < 6:
+                continue
+
+            address = words[3].decode('ascii').split(':')
+            kind = kinds.get(address[0][:1])
+            if kind is None:
+                continue
+
+            endpoint = int(address[3])
+            if address[0][1:] == 'i':
+                endpoint |= 0x80
+
+            # Control submissions carry the setup packet instead of a status
+            position = 5 if words[4] != b's' else 10
+            if len(words) <= position:
+                continue
+            length = int(words[position])
+
+            data = b''
+            if len(words) > position + 2 and words[position + 1] == b'=':
+                data = bytes.fromhex(b''.join(words[position + 2:]).decode('ascii'))
+
+            yield (int(words[1]) * 1e-6, int(address[1]), int(address[2]), endpoint, words[2].decode('ascii'),
+                   kind, length, data)
+
+    def _record(self, linktype: int, order: str, data: bytes, timestamp: float):
+        # One usbmon record of a pcap or pcapng file
+        size = USBMON_HEADERS.get(linktype)
+        if size is None or len(data) < size:
+            return None
+
+        (_, event, kind, endpoint, device, bus, _, _, _, _, _, length, captured) = \
+            struct.unpack_from(USBMON % order, data)
+        return (timestamp, bus, device, endpoint, chr(event), kind, length, data[size:size + captured])
+
+    def _pcap(self, file):
+        (order, resolution) = PCAP_MAGIC[file.read(4)]
+        (_, _, _, _, _, linktype) = struct.unpack(order + 'HHiIII', file.read(20))
+        header = struct.Struct(order + 'IIII')
+
+        while True:
+            record = file.read(header.size)
+            if len(record) < header.size:
+                return
+
+            (seconds, fraction, captured, _) = header.unpack(record)
+            event = self._record(linktype, order, file.read(captured), seconds + fraction * resolution)
+            if event is not None:
+                yield event
+
+    def _pcapng(self, file):
+        order = '<'
+        linktypes = []
+        resolutions = []
+        while True:
+            head = file.read(8)
+            if len(head) < 8:
+                return
+
+            if head[:4] == PCAPNG_MAGIC:
+                # Section header, the byte order magic follows the block length
+                magic = file.read(4)
+                order = '<' if magic == b'\x4d\x3c\x2b\x1a' else '>'
+                (length,) = struct.unpack(order + 'I', head[4:])
+                file.read(length - 12)
+                linktypes = []
+                resolutions = []
+                continue
+
+            (kind, length) = struct.unpack(order + 'II', head)
+            body = file.read(length - 8)
+
+            if kind == 1:
+                # Interface description: link type, then the options holding the time resolution
+                linktypes.append(struct.unpack_from(order + 'H', body)[0])
+                resolutions.append(self._resolution(body, order))
+            elif kind == 6:
+                # Enhanced packet: interface, timestamp, captured and original length, data
+                (interface, high, low, captured, _) = struct.unpack_from(order + 'IIIII', body)
+                timestamp = ((high << 32) | low) * resolutions[interface]
+                event = self._record(linktypes[interface], order, body[20:20 + captured], timestamp)
+                if event is not None:
+                    yield event
+
+    def _resolution(self, body: bytes, order: str) -> float:
+        offset = 8
+        while offset + 4 <= len(body) - 4:
+            (code, length) = struct.unpack_from(order + 'HH', body, offset)
+            if code == 0:
+                break
+            if code == 9:
+                value = body[offset + 4]
+                return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+            offset += 4 + (length + 3) // 4 * 4
+        return 1e-6
+
+    def frames(self):
+        """Yields (timestamp, direction, data) for every frame sent to or received from the device."""
+        for (timestamp, bus, device, endpoint, event, kind, length, data) in self.events():
+            if kind == XFER_CONTROL:
+                if event == 'C':
+                    self._learn(bus, device, data)
+                continue
+
+            if kind != XFER_INTERRUPT or length != FRAME_SIZE:
+                continue
+
+            if self.address is None or self.endpoints is None:
+                self.unknown += 1
+                continue
+
+            if not self._accept(bus, device, endpoint):
+                continue
+
+            if endpoint & 0x80:
+                if event != 'C':
+                    continue
+                direction = DIR_IN
+            else:
+                if event != 'S':
+                    continue
+                direction = DIR_OUT
+
+            if len(data) < FRAME_SIZE:
+                self.truncated += 1
+                continue
+
+            yield (timestamp, direction, data[:FRAME_SIZE])
+
+    def exchanges(self, backlog: int = 16):
+        """Pairs every outgoing frame with the next incoming frame.
+
+        Parameters
+        ----------
+        backlog : int
+            The number of requests waiting for a response which are kept,
+            older requests are yielded without a response.
+
+        Yields
+        ------
+        tuple
+            (timestamp, request, response), the raw 64 byte frames. Either
+            may be None for unpaired frames.
+
+        """
+
+        pending = deque()
+        for (timestamp, direction, data) in self.frames():
+            if direction == DIR_OUT:
+                if len(pending) == backlog:
+                    yield pending.popleft() + (None,)
+                pending.append((timestamp, data))
+            elif pending:
+                yield pending.popleft() + (data,)
+            else:
+                yield (timestamp, None, data)
+
+        while pending:
+            yield pending.popleft() + (None,)
+
+    def packets(self, lazy: bool = True, backlog: int = 16):
+        """Yields (timestamp, request, response) for every exchange, decoded into packets.
+
+           Lazy decoding is the default since read requests are sent with
+           empty fields, which do not pass strict validation, see
+           decode_frame().
+        """
+        for (timestamp, request, response) in self.exchanges(backlog):
+            yield (timestamp,
+                   decode_frame(request, lazy) if request is not None else None,
+                   decode_frame(response, lazy) if response is not None else None)
+
+    def convert(self, path: str) -> int:
+        """Writes the frames into a trace file, see capture.Recorder. Returns the number of frames."""
+        with Recorder(path) as recorder:
+            for (timestamp, direction, data) in self.frames():
+                recorder.write(timestamp, direction, data)
+        return recorder.count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Imports the frames of the cooler from usbmon captures.')
+    parser.add_argument('path', help='A usbmon text capture, or a pcap/pcapng file.')
+    parser.add_argument('--address', help='The bus and device numbers, as bus:device.')
+    parser.add_argument('--endpoints', help='The interrupt endpoints of the interface, as 0x01,0x82.')
+    parser.add_argument('--trace', help='Writes the frames to a trace file rather than printing them.')
+    args = parser.parse_args()
+
+    address = tuple(int(value) for value in args.address.split(':')) if args.address else None
+    endpoints = tuple(int(value, 0) for value in args.endpoints.split(',')) if args.endpoints else None
+    importer = Importer(args.path, address, endpoints)
+
+    if args.trace:
+        print("%d frames written to %s" % (importer.convert(args.trace), args.trace))
+    else:
+        for (timestamp, request, response) in importer.packets():
+            print("%14.6f %-40s %s" % (timestamp, request.displayName() if request is not None else '-',
+                                       response.displayName() if response is not None else '-'))
+
+    if importer.truncated:
+        print("%d truncated frames skipped" % importer.truncated)
+    if importer.unknown:
+        print("%d frames skipped before the device was identified, see --address and --endpoints" %
+              importer.unknown)
+
+
+if __name__ == '__main__':
+    main()
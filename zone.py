@@ -68,7 +68,7 @@ Caps.typeMap = {
 
 class Zone():
     def __init__(self, effect: Effect):
-        self._copyEffect(effect)
+        self.applyEffect(effect)
 
     def _copyEffect(self, effect: Effect) -> None:
         if not self.getCaps().validate(effect):
@@ -94,13 +94,13 @@ class Ring(Zone):
         self._copyEffect(effect)
 
 
-# Effect 0x06
+# Effect 0x05
 class Logo(Zone):
     def getCaps(self) -> Caps:
         return Caps(Caps.STATIC | Caps.CYCLE | Caps.BREATHING | Caps.OFF)
 
     def _getId(self) -> BYTE:
-        return BYTE(0x06)
+        return BYTE(0x05)
 
     def applyEffect(self, effect: Effect) -> None:
         self._copyEffect(effect)
@@ -116,7 +116,7 @@ class Logo(Zone):
         settings.setId(self._getId())
 
 
-# Effect 0x05
+# Effect 0x06
 # NOTE packet 0x94 is wrong (see c code)
 class Fan(Logo):
     def __init__(self, effect: Effect, mirage: Mirage = None):
@@ -124,7 +124,7 @@ class Fan(Logo):
         self.setMirage(mirage)
 
     def _getId(self) -> BYTE:
-        return BYTE(0x05)
+        return BYTE(0x06)
 
     def getMirage(self) -> Mirage:
         return self.mirage